@@ -1,42 +1,117 @@
+import io
+import mmap
 import re
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
 
 PDF = Path("data/external/bells/bells_brownstein2012.pdf")
 OUT = Path("data/processed/bells/bells_clean.csv")
 
-def pdf_to_text(pdf_path: Path) -> str:
-    # pdfplumber is the least painful for text-based PDFs like this one
+_WS = re.compile(r"\s+")
+# JHHMM±DDMM from either a full (JHHMMSS.ss±DDMMSS.s) or truncated name
+_SHORT_KEY = re.compile(r"J(\d{4})(?:\d{2}\.\d{2})?([+-])(\d{4})")
+
+class _MappedRaw(io.RawIOBase):
+    """Read-only, seekable raw stream over an mmap; readinto() copies only the bytes asked for."""
+
+    def __init__(self, mm):
+        self._view = memoryview(mm)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def readinto(self, b):
+        chunk = self._view[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        memoryview(b).cast("B")[:n] = chunk
+        self._pos += n
+        return n
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+@contextmanager
+def _mapped(path: Path):
+    # The parsers seek back and forth through the xref table; serve those
+    # reads from the page cache via a read-only mapping instead of reading
+    # the file into a private buffer. Only the buffered reader's block is
+    # ever copied; pdfminer needs an io.IOBase, hence the adapter.
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with io.BufferedReader(_MappedRaw(mm)) as fp:
+            yield fp
+
+def pdf_to_text(pdf_path: Path, engine: str = "pdfminer") -> str:
+    if engine == "pdfminer":
+        # Single pass over the raw text stream; skips pdfplumber's per-page
+        # char/word clustering, which we don't need for line regexes.
+        from pdfminer.high_level import extract_text
+        with _mapped(pdf_path) as fp:
+            return extract_text(fp)
+
+    # pdfplumber is slower but reconstructs table rows line by line
     import pdfplumber
     chunks = []
-    with pdfplumber.open(str(pdf_path)) as pdf:
+    with _mapped(pdf_path) as fp, pdfplumber.open(fp) as pdf:
         for page in pdf.pages:
             t = page.extract_text() or ""
             chunks.append(t)
     return "\n".join(chunks)
 
 def norm_name(s: str) -> str:
-    s = s.strip()
-    s = re.sub(r"\s+", " ", s)
-    # normalize minus sign variants
-    s = s.replace("−", "-").replace("–", "-")
-    return s
+    # collapse whitespace, normalize minus sign variants
+    return _WS.sub(" ", s.strip()).replace("−", "-").replace("–", "-")
 
-def main():
-    if not PDF.exists():
-        raise FileNotFoundError(f"Missing {PDF}. Download it first.")
+def short_key(name: str):
+    """Table-5 style JHHMM±DDMM key for a normalized name (None if unparsable)."""
+    m = _SHORT_KEY.search(_WS.sub("", name))
+    return f"J{m.group(1)}{m.group(2)}{m.group(3)}" if m else None
 
-    text = pdf_to_text(PDF)
+# Row patterns are built per table layout (digit widths) and cached, so each
+# layout is compiled once however many PDFs of that schema are parsed.
+# Defaults are the Brownstein+2012 layout.
+
+@lru_cache(maxsize=None)
+def _t2_pat(ra_digits: int = 6, dec_digits: int = 6, z_decimals: int = 4):
+    # name (JHHMMSS.ss±DDMMSS.s), one skipped column, zL, zS
+    return re.compile(
+        rf"^(SDSS J\d{{{ra_digits}}}\.\d{{2}}\s*[+-]\s*\d{{{dec_digits}}}\.\d)\s+\S+\s+"
+        rf"(\d\.\d{{{z_decimals}}})\s+(\d\.\d{{{z_decimals}}})\s+",
+        re.MULTILINE
+    )
 
+@lru_cache(maxsize=None)
+def _t5_pat(ra_digits: int = 4, dec_digits: int = 4, theta_decimals: int = 3):
+    # short name (JHHMM±DDMM), theta_E, a second radius, one-decimal column
+    return re.compile(
+        rf"^(SDSS J\d{{{ra_digits}}}\s*[+-]\s*\d{{{dec_digits}}})\s+"
+        rf"(\d\.\d{{{theta_decimals}}})\s+(\d\.\d{{{theta_decimals}}})\s+(\d+\.\d)\s+",
+        re.MULTILINE
+    )
+
+def parse_tables(text: str):
     # ---- Parse Table 2 lines containing zL and zS ----
     # Example from the PDF text:
     # SDSS J015107.37 + 004909.0 ... 0.5171 1.3636 ...
     t2 = {}
-    t2_pat = re.compile(
-        r"^(SDSS J\d{6}\.\d{2}\s*[+-]\s*\d{6}\.\d)\s+\S+\s+(\d\.\d{4})\s+(\d\.\d{4})\s+",
-        re.MULTILINE
-    )
-    for m in t2_pat.finditer(text):
+    for m in _t2_pat().finditer(text):
         name = norm_name(m.group(1))
         zl = float(m.group(2))
         zs = float(m.group(3))
@@ -46,23 +121,53 @@ def main():
     # Example from the PDF text:
     # SDSS J0151 + 0049 0.676 0.752 111.0 ...
     t5 = {}
-    t5_pat = re.compile(
-        r"^(SDSS J\d{4}\s*[+-]\s*\d{4})\s+(\d\.\d{3})\s+(\d\.\d{3})\s+(\d+\.\d)\s+",
-        re.MULTILINE
-    )
-    for m in t5_pat.finditer(text):
+    for m in _t5_pat().finditer(text):
         name = norm_name(m.group(1))
         thetaE = float(m.group(2))
         t5[name] = thetaE
 
-    # Join: Table5 names are truncated; match them to Table2 by prefix
+    return t2, t5
+
+# Any line that starts with a Table-2 (full) or Table-5 (short) style name,
+# whether or not the rest of its row follows on the same line
+_T2_NAME = re.compile(r"^(SDSS J\d{6}\.\d{2}\s*[+-]\s*\d{6}\.\d)", re.MULTILINE)
+_T5_NAME = re.compile(r"^(SDSS J\d{4}\s*[+-]\s*\d{4})(?![\d.])", re.MULTILINE)
+
+def unmatched_rows(text: str, t2: dict, t5: dict) -> int:
+    """Count of names that start a line in `text` but whose table row did not parse."""
+    n2 = {norm_name(m.group(1)) for m in _T2_NAME.finditer(text)} - t2.keys()
+    n5 = {norm_name(m.group(1)) for m in _T5_NAME.finditer(text)} - t5.keys()
+    return len(n2) + len(n5)
+
+def main():
+    if not PDF.exists():
+        raise FileNotFoundError(f"Missing {PDF}. Download it first.")
+
+    text = pdf_to_text(PDF)
+    t2, t5 = parse_tables(text)
+    missed = unmatched_rows(text, t2, t5)
+    print(f"pdfminer: Table2={len(t2)} Table5={len(t5)} unparsed rows={missed}")
+    if missed or not t2 or not t5:
+        # pdfminer's text-box grouping can split table rows across lines,
+        # losing some lenses; pdfplumber rebuilds the rows line by line
+        t2, t5 = parse_tables(pdf_to_text(PDF, engine="pdfplumber"))
+        print(f"pdfplumber: Table2={len(t2)} Table5={len(t5)}")
+
+    # Join: Table5 names are truncated; index Table2 by the same truncated key
+    t2_by_short = {}
+    n_by_short = {}
+    for full in t2:
+        key = short_key(full)
+        t2_by_short[key] = full
+        n_by_short[key] = n_by_short.get(key, 0) + 1
+
     rows = []
     for short, thetaE in t5.items():
-        # Find the unique Table2 entry that starts with this truncated name
-        candidates = [k for k in t2.keys() if k.startswith(short.replace("  ", " "))]
-        if len(candidates) != 1:
+        # Require a unique Table2 entry with this truncated name
+        key = short_key(short)
+        if key is None or n_by_short.get(key, 0) != 1:
             continue
-        full = candidates[0]
+        full = t2_by_short[key]
         zl, zs = t2[full]
         # Create lens_id format like your pipeline expects (JHHMM±DDMM)
         lens_id = short.replace("SDSS ", "").replace(" ", "")
@@ -91,6 +196,7 @@ def main():
 
     print("Parsed Table2 entries:", len(t2))
     print("Parsed Table5 entries:", len(t5))
+    print("Joined entries:", len(rows))
     print("Wrote:", OUT, "rows=", len(df))
     print(df.head(10).to_string(index=False))
 
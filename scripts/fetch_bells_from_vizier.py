@@ -9,11 +9,14 @@ from astroquery.vizier import Vizier
 CATALOG_ID = "J/ApJ/744/41"  # Brownstein et al. 2012, BELLS
 OUT = Path("data/processed/bells/bells_clean.csv")
 
+_WS_ALL = re.compile(r"\s+")
+_JID = re.compile(r"J\d{4}[+-]\d{4}")
+
 
 def norm_sysname(x: str) -> str:
     x = str(x).strip()
     x = x.replace("−", "-").replace("–", "-")
-    x = re.sub(r"\s+", "", x)
+    x = _WS_ALL.sub("", x)
     return x
 
 
@@ -74,16 +77,23 @@ def main():
     zt["_key"] = zt[z_name].map(norm_sysname)
     tt["_key"] = tt[t_name].map(norm_sysname)
 
+    # Shared categorical keys: the join runs on integer codes, not strings.
+    keys = pd.CategoricalDtype(sorted(set(zt["_key"]) | set(tt["_key"])))
+    zt["_key"] = zt["_key"].astype(keys)
+    tt["_key"] = tt["_key"].astype(keys)
+
+    # Each system must have exactly one redshift row.
     merged = tt.merge(
         zt[["_key", zl_col, zs_col]],
         on="_key",
         how="inner",
+        validate="m:1",
     )
 
     def make_lens_id(raw: str) -> str:
         raw = str(raw).replace("−", "-").replace("–", "-")
         raw = raw.replace("SDSS", "").replace(" ", "")
-        m = re.search(r"J\d{4}[+-]\d{4}", raw)
+        m = _JID.search(raw)
         return m.group(0) if m else raw
 
     out = pd.DataFrame({
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 """
-Ingest Cao+2015 strong-lens compilation into a clean, validated CSV.
+Ingest Cao+2015 strong-lens compilation into a clean, validated table.
 
 Input (raw, immutable):
   data/external/cao2015/cao2015_raw.csv
@@ -9,10 +9,12 @@ Expected columns (from your header):
   Name,zl,zs,Sigma,e_Sigma,thetaE,Survey,thetaAp,thetaEff,Sig0,e_Sig0,Cat,SimbadName,_RA,_DE
 
 Outputs:
-  data/processed/cao2015/cao2015_with_flags.csv   (all rows, with validation flags)
-  data/processed/cao2015/cao2015_clean.csv        (strictly valid subset)
+  data/processed/cao2015/cao2015_with_flags.parquet   (all rows, with validation flags)
+  data/processed/cao2015/cao2015_clean.parquet        (strictly valid subset)
   data/processed/cao2015/cao2015_ingest_report.txt
 
+  Pass --emit-csv to also write the .csv twins of both tables.
+
 Validation rules (strict):
   - thetaE_arcsec > 0
   - zl >= 0, zs >= 0
@@ -21,110 +23,149 @@ Validation rules (strict):
 
 from __future__ import annotations
 
+import argparse
+import sys
+
 import numpy as np
 
 from pathlib import Path
 import pandas as pd
 
-
+# If "src" isn't importable when running as a script, add project root to sys.path.
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.io.arrow_csv import read_csv  # noqa: E402
+
 
 INFILE_DEFAULT = ROOT / "data" / "external" / "cao2015" / "cao2015_raw.csv"
 OUTDIR = ROOT / "data" / "processed" / "cao2015"
 
-OUT_WITH_FLAGS = OUTDIR / "cao2015_with_flags.csv"
-OUT_CLEAN = OUTDIR / "cao2015_clean.csv"
+OUT_WITH_FLAGS = OUTDIR / "cao2015_with_flags.parquet"
+OUT_CLEAN = OUTDIR / "cao2015_clean.parquet"
 OUT_REPORT = OUTDIR / "cao2015_ingest_report.txt"
 
 
-def _to_float(x, flags: list[str], name: str):
-    if pd.isna(x):
-        flags.append(f"flag_missing_{name}")
-        return None
-    try:
-        v = float(x)
-    except Exception:
-        flags.append(f"flag_non_numeric_{name}")
-        return None
-    if not np.isfinite(v):
-        flags.append(f"flag_non_finite_{name}")
-        return None
-    return v
-
-
-def validate_row(zl, zs, thetaE):
-    flags: list[str] = []
-
-    zl_v = _to_float(zl, flags, "z_l")
-    zs_v = _to_float(zs, flags, "z_s")
-    th_v = _to_float(thetaE, flags, "theta_E_arcsec")
-
-    if zl_v is not None and zl_v < 0:
-        flags.append("flag_zl_negative")
-    if zs_v is not None and zs_v < 0:
-        flags.append("flag_zs_negative")
-    if th_v is not None and th_v <= 0:
-        flags.append("flag_thetaE_nonpositive")
-    if (zl_v is not None) and (zs_v is not None) and not (zs_v > zl_v):
-        flags.append("flag_zs_le_zl")
-
-    is_valid = (len(flags) == 0)
-    norm = {}
-    if is_valid:
-        norm = {"z_l": float(zl_v), "z_s": float(zs_v), "theta_E_arcsec": float(th_v)}
+def _numeric_checks(x: pd.Series, name: str):
+    """
+    Coerce one raw column to float and return (values, checks), where checks
+    is a list of (flag_name, mask) for missing / non-numeric / non-finite
+    entries. `values` is NaN wherever any of these masks is set.
+    """
+    v = pd.to_numeric(x, errors="coerce").astype(float)
+    missing = x.isna()
+    non_numeric = v.isna() & ~missing
+    if not pd.api.types.is_numeric_dtype(x):
+        # to_numeric's string parser is not correctly rounded; re-parse the
+        # numeric entries exactly, as float() would.
+        ok = ~missing & ~non_numeric
+        v[ok] = x[ok].astype(float)
+    non_finite = v.notna() & ~np.isfinite(v)
+    checks = [
+        (f"flag_missing_{name}", missing),
+        (f"flag_non_numeric_{name}", non_numeric),
+        (f"flag_non_finite_{name}", non_finite),
+    ]
+    return v.where(np.isfinite(v)), checks
+
+
+def validate_frame(zl: pd.Series, zs: pd.Series, thetaE: pd.Series):
+    """
+    Vectorized validation of the raw columns.
+
+    Returns (is_valid, flags, norm): a boolean Series, a Series of
+    ';'-joined flag strings, and a dict of normalized float Series
+    (NaN where the row is invalid).
+    """
+    zl_v, zl_checks = _numeric_checks(zl, "z_l")
+    zs_v, zs_checks = _numeric_checks(zs, "z_s")
+    th_v, th_checks = _numeric_checks(thetaE, "theta_E_arcsec")
+
+    # Comparisons against NaN are False, so these only fire on finite values.
+    checks = zl_checks + zs_checks + th_checks + [
+        ("flag_zl_negative", zl_v < 0),
+        ("flag_zs_negative", zs_v < 0),
+        ("flag_thetaE_nonpositive", th_v <= 0),
+        ("flag_zs_le_zl", zl_v.notna() & zs_v.notna() & ~(zs_v > zl_v)),
+    ]
+
+    bad = np.zeros(len(zl), dtype=bool)
+    flags = pd.Series("", index=zl.index, dtype=object)
+    for name, mask in checks:
+        m = mask.to_numpy(dtype=bool)
+        bad |= m
+        flags = flags + np.where(m, name + ";", "")
+    flags = flags.str.rstrip(";")
+
+    is_valid = pd.Series(~bad, index=zl.index)
+    norm = {
+        "z_l": zl_v.where(is_valid),
+        "z_s": zs_v.where(is_valid),
+        "theta_E_arcsec": th_v.where(is_valid),
+    }
     return is_valid, flags, norm
 
 
+def _write_table(df: pd.DataFrame, path: Path, emit_csv: bool) -> list[Path]:
+    df.to_parquet(path, engine="pyarrow", compression="zstd", index=False)
+    written = [path]
+    if emit_csv:
+        csv_path = path.with_suffix(".csv")
+        df.to_csv(csv_path, index=False)
+        written.append(csv_path)
+    return written
+
+
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emit-csv", action="store_true",
+                    help="also write CSV copies of the with-flags and clean tables")
+    args = ap.parse_args()
+
     OUTDIR.mkdir(parents=True, exist_ok=True)
 
     infile = INFILE_DEFAULT
     if not infile.exists():
         raise SystemExit(f"Missing input file: {infile}")
 
-    df = pd.read_csv(infile)
+    df = read_csv(infile)
 
     required = {"Name", "zl", "zs", "thetaE"}
     missing = required - set(df.columns)
     if missing:
         raise SystemExit(f"Missing required columns in CSV: {missing}")
 
-    rows = []
-    for _, r in df.iterrows():
-        is_valid, flags, norm = validate_row(r["zl"], r["zs"], r["thetaE"])
-        out = dict(r)
-
-        out["lens_id"] = str(r["Name"]).strip()
-        out["is_valid"] = bool(is_valid)
-        out["flags"] = ";".join(flags)
-
-        out["z_l_norm"] = norm.get("z_l", "")
-        out["z_s_norm"] = norm.get("z_s", "")
-        out["theta_E_arcsec_norm"] = norm.get("theta_E_arcsec", "")
-
-        rows.append(out)
-
-    out_df = pd.DataFrame(rows)
-    out_df.to_csv(OUT_WITH_FLAGS, index=False)
-
-    clean = out_df[out_df["is_valid"] == True].copy()
-    # Canonical columns for downstream metric code:
-    clean = clean.rename(columns={
+    is_valid, flags, norm = validate_frame(df["zl"], df["zs"], df["thetaE"])
+
+    out_df = df.assign(
+        lens_id=df["Name"].astype(str).str.strip(),
+        is_valid=is_valid,
+        flags=flags,
+        z_l_norm=norm["z_l"],
+        z_s_norm=norm["z_s"],
+        theta_E_arcsec_norm=norm["theta_E_arcsec"],
+    )
+    written = _write_table(out_df, OUT_WITH_FLAGS, args.emit_csv)
+
+    # Canonical columns for downstream metric code. Project and filter in one
+    # step (raw z/thetaE columns are dropped before renaming, so no full copy).
+    canon = {
         "z_l_norm": "z_l",
         "z_s_norm": "z_s",
         "theta_E_arcsec_norm": "theta_E_arcsec",
-    })
+    }
     keep = [
         "lens_id",
-        "z_l", "z_s", "theta_E_arcsec",
+        "z_l_norm", "z_s_norm", "theta_E_arcsec_norm",
         "Survey", "Cat",
         "Sigma", "e_Sigma", "Sig0", "e_Sig0",
         "thetaAp", "thetaEff",
         "SimbadName", "_RA", "_DE",
     ]
-    keep = [c for c in keep if c in clean.columns]
-    clean = clean[keep]
-    clean.to_csv(OUT_CLEAN, index=False)
+    keep = [c for c in keep if c in out_df.columns]
+    clean = out_df.loc[out_df["is_valid"].to_numpy(), keep].rename(columns=canon)
+    written += _write_table(clean, OUT_CLEAN, args.emit_csv)
 
     # Report
     total = len(df)
@@ -154,8 +195,8 @@ def main():
     else:
         lines.append("  (none)")
     lines.append("")
-    lines.append(f"Wrote: {OUT_WITH_FLAGS}")
-    lines.append(f"Wrote: {OUT_CLEAN}")
+    for path in written:
+        lines.append(f"Wrote: {path}")
     lines.append(f"Wrote: {OUT_REPORT}")
 
     OUT_REPORT.write_text("\n".join(lines), encoding="utf-8")
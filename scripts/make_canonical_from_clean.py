@@ -2,41 +2,40 @@ import argparse
 import pandas as pd
 from src.io.canonical import enforce_canonical
 
+# Canonical column -> accepted source spellings, in order of preference
+CANDIDATES = {
+    "lens_id": ["lens_id", "slacs_id", "cao2015_id", "id", "name", "system_name", "lens", "lens_name"],
+    "z_l": ["z_l", "zl", "zLens", "z_lens", "z_lens_spec"],
+    "z_s": ["z_s", "zs", "zSource", "z_source", "z_src", "z_s_spec"],
+    "theta_E_arcsec": ["theta_E_arcsec", "theta_E", "thetaE_arcsec", "theta_e", "thetaE", "rein_arcsec"],
+}
+
+# Stored as float32: redshifts and Einstein radii carry far fewer digits
+FLOAT32_COLS = ["z_l", "z_s", "theta_E_arcsec", "z_s_sigma", "theta_E_sigma_arcsec"]
+# Low-cardinality labels, dictionary-encoded in Parquet
+CATEGORY_COLS = ["catalog", "z_s_type"]
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--catalog", required=True)
-    ap.add_argument("--in_csv", required=True)
+    ap.add_argument("--in_csv", required=True, help="clean table (.csv or .parquet)")
     ap.add_argument("--out_parquet", required=True)
     args = ap.parse_args()
 
-    df = pd.read_csv(args.in_csv)
+    if args.in_csv.endswith(".parquet"):
+        df = pd.read_parquet(args.in_csv)
+    else:
+        df = pd.read_csv(args.in_csv)
 
     # Minimal mapping; works if your clean CSV uses common names.
+    # Column names are matched case-insensitively; first candidate wins.
+    cols_lc = {c.lower(): c for c in df.columns}
     rename = {}
-
-    # lens id
-    for c in ["lens_id", "slacs_id", "cao2015_id", "id", "ID", "name", "system_name", "lens", "lens_name"]:
-        if c in df.columns:
-            rename[c] = "lens_id"
-            break
-
-    # lens redshift
-    for c in ["z_l", "zl", "zLens", "z_lens", "z_lens_spec"]:
-        if c in df.columns:
-            rename[c] = "z_l"
-            break
-
-    # source redshift
-    for c in ["z_s", "zs", "zSource", "z_source", "z_src", "z_s_spec"]:
-        if c in df.columns:
-            rename[c] = "z_s"
-            break
-
-    # Einstein radius
-    for c in ["theta_E_arcsec", "theta_E", "thetaE_arcsec", "theta_e", "thetaE", "rein_arcsec"]:
-        if c in df.columns:
-            rename[c] = "theta_E_arcsec"
-            break
+    for canon, cands in CANDIDATES.items():
+        for c in cands:
+            if c.lower() in cols_lc:
+                rename[cols_lc[c.lower()]] = canon
+                break
 
     df = df.rename(columns=rename)
 
@@ -49,6 +48,10 @@ def main():
         df["theta_E_sigma_arcsec"] = pd.NA
 
     out = enforce_canonical(df, catalog=args.catalog)
+    for c in FLOAT32_COLS:
+        out[c] = pd.to_numeric(out[c], errors="coerce").astype("float32")
+    for c in CATEGORY_COLS:
+        out[c] = out[c].astype("category")
     out.to_parquet(args.out_parquet, index=False)
 
     print("Input columns:", list(df.columns))
@@ -2,11 +2,13 @@ import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+import pyarrow.parquet as pq
 
 def load_S(path: str) -> np.ndarray:
-    df = pd.read_parquet(path)
-    d = df[df["is_valid"]].copy()
-    x = d["S_log"].to_numpy(dtype=float)
+    # Projection + predicate pushdown: only S_log of valid rows is decoded
+    t = pq.read_table(path, columns=["S_log"], filters=[("is_valid", "=", True)])
+    # float32 is plenty for plot limits and halves the bytes percentile scans
+    x = np.ascontiguousarray(t.column("S_log").to_numpy(), dtype=np.float32)
     return x[np.isfinite(x)]
 
 def main():
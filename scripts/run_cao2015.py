@@ -3,7 +3,8 @@
 Run the Source–Redshift Sensitivity metric on the Cao+2015 lens compilation.
 
 Inputs:
-  data/processed/cao2015/cao2015_joined_clean.csv
+  data/processed/cao2015/cao2015_joined_clean.parquet
+    (falls back to the .csv of the same name if no Parquet file exists)
     Required columns:
       - z_l   (lens redshift)
       - z_s   (source redshift)
@@ -12,15 +13,18 @@ Inputs:
       - Name, Survey, etc.
 
 Outputs:
-  outputs/cao2015_results.csv
+  outputs/cao2015_results.parquet
+  outputs/cao2015_results.csv      (only with --emit-csv)
 
 Usage (from project root):
-  python scripts/run_cao2015.py
+  python scripts/run_cao2015.py [--emit-csv]
 """
 
 from __future__ import annotations
 
 from pathlib import Path
+import argparse
+import os
 import sys
 
 import numpy as np
@@ -31,24 +35,55 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src.sensitivity import compute_sensitivity  # noqa: E402
+from src.cosmology import FlatLambdaCDM  # noqa: E402
+from src.io.arrow_csv import read_csv  # noqa: E402
+from src.sensitivity import compute_sensitivity_batch  # noqa: E402
 
 
-INFILE_DEFAULT = ROOT / "data" / "processed" / "cao2015" / "cao2015_joined_clean.csv"
-OUTFILE_DEFAULT = ROOT / "outputs" / "cao2015_results.csv"
+INFILE_DEFAULT = ROOT / "data" / "processed" / "cao2015" / "cao2015_joined_clean.parquet"
+OUTFILE_DEFAULT = ROOT / "outputs" / "cao2015_results.parquet"
+
+# Metric inputs in the canonical clean file; parsed straight to float64.
+_FLOAT_COLUMNS = ("z_l", "z_s", "theta_E_arcsec")
+
+
+def _extremes(S: np.ndarray, k: int = 10):
+    """
+    Positions of the k smallest (ascending) and k largest (descending)
+    values of S. argpartition is O(N); only the 2k picked values get sorted.
+    """
+    n = len(S)
+    if n <= k:
+        order = np.argsort(S, kind="stable")
+        return order, order[::-1]
+    lo = np.argpartition(S, k)[:k]
+    lo = lo[np.argsort(S[lo], kind="stable")]
+    hi = np.argpartition(S, -k)[-k:]
+    hi = hi[np.argsort(-S[hi], kind="stable")]
+    return lo, hi
 
 
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emit-csv", action="store_true",
+                    help="also write the results as CSV next to the Parquet file")
+    args = ap.parse_args()
+
     infile = INFILE_DEFAULT
     outfile = OUTFILE_DEFAULT
 
+    if not infile.exists() and infile.with_suffix(".csv").exists():
+        infile = infile.with_suffix(".csv")
     if not infile.exists():
         raise SystemExit(f"Missing input file: {infile}\n"
                          f"Did you run: python scripts/ingest_cao2015.py ?")
 
     outfile.parent.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(infile)
+    if infile.suffix == ".parquet":
+        df = pd.read_parquet(infile)
+    else:
+        df = read_csv(infile, float_columns=_FLOAT_COLUMNS)
 
     # Column normalization: accept a few common spellings
     colmap = {}
@@ -73,42 +108,44 @@ def main():
             f"Columns present:\n  {list(df.columns)}"
         )
 
-    # Compute sensitivity per row
-    rows = []
-    invalid = 0
-    for i, r in df.iterrows():
-        name = r["Name"] if "Name" in df.columns else r.get("name", f"row_{i}")
-        zl = float(r["z_l"])
-        zs = float(r["z_s"])
-        th = float(r["theta_E_arcsec"])
+    # Config (override via env if desired)
+    H0 = float(os.environ.get("H0_KM_S_MPC", "70.0"))
+    Om0 = float(os.environ.get("OM0", "0.3"))
+    h = float(os.environ.get("FD_H", "1e-3"))
+    delta_z = float(os.environ.get("DELTA_Z", "0.1"))
 
-        # compute_sensitivity is assumed to do its own validation and return a dict
-        res = compute_sensitivity(theta_E_arcsec=th, z_l=zl, z_s=zs)
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=H0, Om0=Om0)
 
-        out = dict(r)  # keep provenance columns
-        out["is_valid"] = bool(res.get("is_valid", True))
-        out["flags"] = res.get("flags", [])
-        if isinstance(out["flags"], list):
-            out["flags"] = ";".join(out["flags"])
+    # Compute sensitivity for all rows in one vectorized call
+    zl = pd.to_numeric(df["z_l"], errors="coerce").to_numpy(dtype=float)
+    zs = pd.to_numeric(df["z_s"], errors="coerce").to_numpy(dtype=float)
+    th = pd.to_numeric(df["theta_E_arcsec"], errors="coerce").to_numpy(dtype=float)
 
-        # Standardize output column name
-        out["S_dlnM_dzs"] = res.get("S_dlnM_dzs", np.nan)
+    res = compute_sensitivity_batch(th, zl, zs, cosmo, h=h, delta_z=delta_z)
 
-        # Include a convenience delta_z
-        out["delta_z"] = zs - zl
-
-        # Keep a stable ID column
-        out["lens_id"] = name
-
-        if not out["is_valid"] or not np.isfinite(out["S_dlnM_dzs"]):
-            invalid += 1
-
-        rows.append(out)
+    # Keep a stable ID column
+    if "Name" in df.columns:
+        names = df["Name"]
+    elif "name" in df.columns:
+        names = df["name"]
+    elif "lens_id" in df.columns:
+        names = df["lens_id"]
+    else:
+        names = [f"row_{i}" for i in df.index]
 
-    outdf = pd.DataFrame(rows)
+    # Keep provenance columns; standardize output column names
+    outdf = df.assign(
+        is_valid=res.is_valid,
+        flags=[";".join(f) for f in res.flags],
+        S_dlnM_dzs=res.S_dlnM_dzs,
+        delta_z=zs - zl,  # convenience separation
+        lens_id=names,
+    )
 
     # Write
-    outdf.to_csv(outfile, index=False)
+    outdf.to_parquet(outfile, engine="pyarrow", compression="zstd", index=False)
+    if args.emit_csv:
+        outdf.to_csv(outfile.with_suffix(".csv"), index=False)
 
     # Console summary
     total = len(outdf)
@@ -137,24 +174,27 @@ def main():
         print("  (none)")
 
     # Extremes (only on valid finite S)
-    vdf = outdf[(outdf["is_valid"] == True) & np.isfinite(outdf["S_dlnM_dzs"])].copy()  # noqa: E712
-    if len(vdf) == 0:
+    # Only the printed columns are sliced out; the wide frame is never copied.
+    keep = (outdf["is_valid"] == True) & np.isfinite(outdf["S_dlnM_dzs"])  # noqa: E712
+    cols = outdf.loc[keep, ["lens_id", "S_dlnM_dzs", "z_l", "z_s", "theta_E_arcsec"]]
+    if len(cols) == 0:
         print("\nNo valid finite S values to summarize.")
         return
 
-    vdf = vdf.sort_values("S_dlnM_dzs")
+    lo_idx, hi_idx = _extremes(cols["S_dlnM_dzs"].to_numpy(dtype=float), 10)
+    # Plain tuples over the printed columns; iterrows would box each row in a Series
     print("\nMost negative S (largest mass decrease per +Δz_s):")
-    for _, rr in vdf.head(10).iterrows():
+    for lens_id, S_i, zl_i, zs_i, th_i in cols.iloc[lo_idx].itertuples(index=False, name=None):
         print(
-            f"  {rr['lens_id']:<12}  S={rr['S_dlnM_dzs']:+.6f}  "
-            f"z_l={rr['z_l']:.3f}  z_s={rr['z_s']:.3f}  thetaE={rr['theta_E_arcsec']:.3f} arcsec"
+            f"  {lens_id:<12}  S={S_i:+.6f}  "
+            f"z_l={zl_i:.3f}  z_s={zs_i:.3f}  thetaE={th_i:.3f} arcsec"
         )
 
     print("\nLeast negative / most positive S:")
-    for _, rr in vdf.tail(10).iloc[::-1].iterrows():
+    for lens_id, S_i, zl_i, zs_i, th_i in cols.iloc[hi_idx].itertuples(index=False, name=None):
         print(
-            f"  {rr['lens_id']:<12}  S={rr['S_dlnM_dzs']:+.6f}  "
-            f"z_l={rr['z_l']:.3f}  z_s={rr['z_s']:.3f}  thetaE={rr['theta_E_arcsec']:.3f} arcsec"
+            f"  {lens_id:<12}  S={S_i:+.6f}  "
+            f"z_l={zl_i:.3f}  z_s={zs_i:.3f}  thetaE={th_i:.3f} arcsec"
         )
 
 
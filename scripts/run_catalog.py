@@ -1,15 +1,11 @@
-cat > scripts/run_catalog.py <<'PY'
 from __future__ import annotations
 import argparse
 import os
 import pandas as pd
 import numpy as np
 
-from src.metrics.sensitivity import dlnM_dzs, Minf
-from src.plots.report import (
-    fig1_hist_S, fig2_scatter_S_vs_zsep, fig3_scatter_S_vs_zl, fig4_bias_proxy,
-    table1_summary, table2_top_sensitive
-)
+from src.metrics.sensitivity_numba import dlnM_dzs_batch
+from src.plots.report import write_figures, table1_summary, table2_top_sensitive
 
 def main():
     ap = argparse.ArgumentParser()
@@ -25,21 +21,22 @@ def main():
 
     df = pd.read_parquet(args.infile).copy()
 
-    df["dlnM_dzs"] = np.nan
-    df["S_log"] = np.nan
-    df["delta_lnM_0p1"] = np.nan
-    df["Minf_zs"] = np.nan
+    n = len(df)
+    dlnM = np.full(n, np.nan)
+    S_log = np.full(n, np.nan)
+    Minf_arr = np.full(n, np.nan)
 
     valid = df["is_valid"].astype(bool).to_numpy()
-    for i in np.where(valid)[0]:
-        zl = float(df.loc[i, "z_l"])
-        zs = float(df.loc[i, "z_s"])
-        th = float(df.loc[i, "theta_E_arcsec"])
-        d = dlnM_dzs(th, zl, zs, H0, args.Om0, dz=args.dz)
-        df.loc[i, "dlnM_dzs"] = d
-        df.loc[i, "S_log"] = abs(d) if np.isfinite(d) else np.nan
-        df.loc[i, "delta_lnM_0p1"] = abs(d) * 0.1 if np.isfinite(d) else np.nan
-        df.loc[i, "Minf_zs"] = Minf(th, zl, zs, H0, args.Om0)
+    zl = df["z_l"].to_numpy(dtype=float)[valid]
+    zs = df["z_s"].to_numpy(dtype=float)[valid]
+    th = df["theta_E_arcsec"].to_numpy(dtype=float)[valid]
+
+    S_log[valid], dlnM[valid], Minf_arr[valid] = dlnM_dzs_batch(th, zl, zs, H0, args.Om0, args.dz)
+
+    df["dlnM_dzs"] = dlnM
+    df["S_log"] = S_log
+    df["delta_lnM_0p1"] = S_log * 0.1
+    df["Minf_zs"] = Minf_arr
 
     figdir = os.path.join(args.outdir, "figures")
     tabdir = os.path.join(args.outdir, "tables")
@@ -48,11 +45,7 @@ def main():
 
     df.to_parquet(os.path.join(args.outdir, f"{args.catalog}_metrics.parquet"), index=False)
 
-    dvalid = df[df["is_valid"]].copy()
-    fig1_hist_S(dvalid, os.path.join(figdir, "fig1_hist_S.pdf"))
-    fig2_scatter_S_vs_zsep(dvalid, os.path.join(figdir, "fig2_S_vs_zs_minus_zl.pdf"))
-    fig3_scatter_S_vs_zl(dvalid, os.path.join(figdir, "fig3_S_vs_zl.pdf"))
-    fig4_bias_proxy(dvalid, os.path.join(figdir, "fig4_hist_dlnM_dz0p1.pdf"))
+    write_figures(df[df["is_valid"]], figdir)
 
     t1 = table1_summary(df)
     t1.to_csv(os.path.join(tabdir, "table1_summary.csv"), index=False)
@@ -64,5 +57,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-PY
-
@@ -18,11 +18,13 @@ Notes:
 
 from __future__ import division
 
-import csv
 import os
 import sys
 from collections import Counter
 
+import numpy as np
+import pandas as pd
+
 # Ensure project root on sys.path when running as a script.
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
@@ -37,13 +39,31 @@ OUTPUT_DIR = os.path.join(PROJECT_ROOT, "outputs")
 OUTPUT_CSV = os.path.join(OUTPUT_DIR, "pilot_results.csv")
 
 
-def _safe_float(x):
-    if x is None:
-        return None
-    s = str(x).strip()
-    if s == "" or s.lower() in ("na", "nan", "none", "null"):
-        return None
-    return float(s)
+REQUIRED_COLUMNS = ["lens_id", "theta_E_arcsec", "z_l", "z_s"]
+
+# SensitivityResult fields, stored column-wise (one array per field).
+# Inputs are echoed as given for invalid rows, so they are object arrays.
+ECHO_FIELDS = ["theta_E_arcsec", "z_l", "z_s"]
+FLOAT_FIELDS = ["theta_E_rad", "D_l_m", "Sigma_crit_kg_m2", "M_inf_kg",
+                "S_dlnM_dzs", "dM_over_M_for_delta_z"]
+OUTPUT_COLUMNS = [
+    "lens_id",
+    "is_valid",
+    "flags",
+    "theta_E_arcsec",
+    "z_l",
+    "z_s",
+    "theta_E_rad",
+    "D_l_m",
+    "Sigma_crit_kg_m2",
+    "M_inf_kg",
+    "S_dlnM_dzs",
+    "delta_z_ref",
+    "dM_over_M_for_delta_z",
+]
+# Cells read as missing (flag_missing_*): these spellings after strip(),
+# in any case, as the original csv-module loader treated them.
+MISSING_TEXT = frozenset(["", "na", "nan", "none", "null"])
 
 
 def _ensure_dirs():
@@ -51,29 +71,76 @@ def _ensure_dirs():
         os.makedirs(OUTPUT_DIR)
 
 
-def _read_input_rows(path):
+def _coerce_column(raw):
+    """
+    One raw text column as validation gets it: float for numeric text, None
+    for MISSING_TEXT and the text as read for anything else (which validation
+    flags as non-numeric). All-numeric columns come back as float64.
+    """
+    text = raw.str.strip()
+    missing = text.str.lower().isin(MISSING_TEXT)
+    num = pd.to_numeric(text.mask(missing), errors="coerce")
+    bad = ~missing & num.isna()
+    if not (missing.any() or bad.any()):
+        return num.to_numpy(dtype=float)
+    out = num.to_numpy(dtype=object)
+    out[missing.to_numpy()] = None
+    out[bad.to_numpy()] = raw[bad].to_numpy()
+    return out
+
+
+def _read_input(path):
     if not os.path.exists(path):
         raise IOError("Input CSV not found: %s" % path)
 
-    with open(path, "r") as f:
-        reader = csv.DictReader(f)
-        required = ["lens_id", "theta_E_arcsec", "z_l", "z_s"]
-        for r in required:
-            if r not in reader.fieldnames:
-                raise ValueError("Missing required column '%s' in %s" % (r, path))
-
-        rows = []
-        for row in reader:
-            rows.append(row)
-        return rows
-
-
-def _write_output(path, rows, fieldnames):
-    with open(path, "w") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for r in rows:
-            writer.writerow(r)
+    # One untyped read of the required columns (extras are skipped); the
+    # numeric columns are then coerced cell by cell in array passes.
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_filter=False,
+                     usecols=lambda c: c in REQUIRED_COLUMNS)
+
+    for r in REQUIRED_COLUMNS:
+        if r not in df.columns:
+            raise ValueError("Missing required column '%s' in %s" % (r, path))
+    for c in ECHO_FIELDS:
+        df[c] = _coerce_column(df[c])
+    return df
+
+_CSV_SPECIAL = (",", '"', "\n", "\r")
+
+
+def _csv_text(x):
+    # Minimal quoting, as csv/pandas would; None and NaN are empty cells and
+    # floats are %.8g, as in float columns.
+    if x is None or x != x:
+        return ""
+    if isinstance(x, float):
+        return "%.8g" % x
+    s = str(x)
+    if any(c in s for c in _CSV_SPECIAL):
+        return '"' + s.replace('"', '""') + '"'
+    return s
+
+
+def _format_column(a):
+    """One column as a list of CSV cells (floats as %.8g)."""
+    a = np.asarray(a)
+    if a.dtype.kind == "f":
+        return ["" if v != v else "%.8g" % v for v in a.tolist()]
+    if a.dtype.kind == "b":
+        return ["True" if v else "False" for v in a.tolist()]
+    return [_csv_text(v) for v in a.tolist()]
+
+
+def _write_output(path, cols):
+    """
+    Write the fixed-schema result columns (dict of arrays, OUTPUT_COLUMNS
+    order) as CSV. Each column is formatted in one pass by dtype and rows
+    are joined directly, with no per-row DataFrame or csv.writer dispatch.
+    """
+    cells = [_format_column(cols[c]) for c in OUTPUT_COLUMNS]
+    with open(path, "w", newline="") as f:
+        f.write(",".join(OUTPUT_COLUMNS) + "\n")
+        f.writelines(",".join(row) + "\n" for row in zip(*cells))
 
 
 def main():
@@ -86,88 +153,58 @@ def main():
     h = 1e-3
     delta_z = 0.1
 
-    in_rows = _read_input_rows(INPUT_CSV)
+    df = _read_input(INPUT_CSV)
 
-    out_rows = []
+    n_total = len(df)
+    lens_ids = df["lens_id"].fillna("").astype(str).str.strip().to_numpy(dtype=object)
+    is_valid = np.zeros(n_total, dtype=bool)
+    flags_arr = np.empty(n_total, dtype=object)
+    echo = {f: np.empty(n_total, dtype=object) for f in ECHO_FIELDS}
+    vals = {f: np.full(n_total, np.nan) for f in FLOAT_FIELDS}
     flag_counts = Counter()
-    n_valid = 0
-
-    for row in in_rows:
-        lens_id = (row.get("lens_id") or "").strip()
-
-        try:
-            th = _safe_float(row.get("theta_E_arcsec"))
-        except Exception:
-            th = row.get("theta_E_arcsec")  # pass through for validation flags
-
-        try:
-            zl = _safe_float(row.get("z_l"))
-        except Exception:
-            zl = row.get("z_l")
 
-        try:
-            zs = _safe_float(row.get("z_s"))
-        except Exception:
-            zs = row.get("z_s")
+    # Missing cells go to validation as None (flag_missing_*), not NaN.
+    def _cell(x):
+        return None if (x is None or x != x) else x
 
+    for i, (th, zl, zs) in enumerate(zip(df["theta_E_arcsec"], df["z_l"], df["z_s"])):
         res = compute_sensitivity(
-            theta_E_arcsec=th,
-            z_l=zl,
-            z_s=zs,
+            theta_E_arcsec=_cell(th),
+            z_l=_cell(zl),
+            z_s=_cell(zs),
             cosmo=cosmo,
             h=h,
             delta_z=delta_z,
         )
 
         # Flatten flags into a compact string for CSV output.
-        flags = res.get("flags", [])
-        flags_str = ";".join(flags) if flags else ""
-
-        if res.get("is_valid"):
-            n_valid += 1
-        for fl in flags:
-            flag_counts[fl] += 1
-
-        out_row = {
-            "lens_id": lens_id,
-            "is_valid": bool(res.get("is_valid")),
-            "flags": flags_str,
-
-            "theta_E_arcsec": res.get("theta_E_arcsec"),
-            "z_l": res.get("z_l"),
-            "z_s": res.get("z_s"),
-
-            "theta_E_rad": res.get("theta_E_rad"),
-            "D_l_m": res.get("D_l_m"),
-            "Sigma_crit_kg_m2": res.get("Sigma_crit_kg_m2"),
-            "M_inf_kg": res.get("M_inf_kg"),
-
-            "S_dlnM_dzs": res.get("S_dlnM_dzs"),
-            "delta_z_ref": float(delta_z),
-            "dM_over_M_for_delta_z": res.get("dM_over_M_for_delta_z"),
-        }
-        out_rows.append(out_row)
-
-    fieldnames = [
-        "lens_id",
-        "is_valid",
-        "flags",
-        "theta_E_arcsec",
-        "z_l",
-        "z_s",
-        "theta_E_rad",
-        "D_l_m",
-        "Sigma_crit_kg_m2",
-        "M_inf_kg",
-        "S_dlnM_dzs",
-        "delta_z_ref",
-        "dM_over_M_for_delta_z",
-    ]
-
-    _write_output(OUTPUT_CSV, out_rows, fieldnames)
+        flags = res.flags
+        flags_arr[i] = ";".join(flags) if flags else ""
+        flag_counts.update(flags)
+
+        is_valid[i] = res.is_valid
+        echo["theta_E_arcsec"][i] = res.theta_E_arcsec
+        echo["z_l"][i] = res.z_l
+        echo["z_s"][i] = res.z_s
+        vals["theta_E_rad"][i] = res.theta_E_rad
+        vals["D_l_m"][i] = res.D_l_m
+        vals["Sigma_crit_kg_m2"][i] = res.Sigma_crit_kg_m2
+        vals["M_inf_kg"][i] = res.M_inf_kg
+        vals["S_dlnM_dzs"][i] = res.S_dlnM_dzs
+        vals["dM_over_M_for_delta_z"][i] = res.dM_over_M_for_delta_z
+
+    n_valid = int(is_valid.sum())
+
+    cols = {"lens_id": lens_ids, "is_valid": is_valid, "flags": flags_arr}
+    for f in ECHO_FIELDS:
+        # float64 when every row is numeric, else object (floats still %.8g)
+        cols[f] = pd.Series(echo[f]).infer_objects().to_numpy()
+    cols.update(vals)
+    cols["delta_z_ref"] = np.full(n_total, float(delta_z))
+
+    _write_output(OUTPUT_CSV, cols)
 
     # ---- Console summary ----
-    n_total = len(out_rows)
     print("Input:  %s" % INPUT_CSV)
     print("Output: %s" % OUTPUT_CSV)
     print("Total systems: %d" % n_total)
@@ -181,31 +218,26 @@ def main():
     else:
         print("\nFlag counts: (none)")
 
-    # Rank by S among valid rows
-    valid_rows = [r for r in out_rows if r["is_valid"] and r["S_dlnM_dzs"] is not None]
-    # Filter out NaNs (string "nan" may appear depending on writer/float formatting)
-    def _finite(x):
-        try:
-            xf = float(x)
-            return (xf == xf) and (xf != float("inf")) and (xf != float("-inf"))
-        except Exception:
-            return False
+    # Rank by S among valid rows with finite S (one stable C-level sort)
+    S_vals = np.where(is_valid, vals["S_dlnM_dzs"], np.nan)
+    finite = np.flatnonzero(np.isfinite(S_vals))
+    order = finite[np.argsort(S_vals[finite], kind="stable")]
 
-    valid_rows = [r for r in valid_rows if _finite(r["S_dlnM_dzs"])]
+    if order.size:
+        k = min(5, order.size)
 
-    if valid_rows:
-        valid_rows_sorted = sorted(valid_rows, key=lambda r: float(r["S_dlnM_dzs"]))
-        k = min(5, len(valid_rows_sorted))
+        def _line(i):
+            return ("  %-20s  S=% .6f  z_l=%.3f  z_s=%.3f  thetaE=%.3f arcsec" %
+                    (lens_ids[i], S_vals[i], float(echo["z_l"][i]), float(echo["z_s"][i]),
+                     float(echo["theta_E_arcsec"][i])))
 
         print("\nMost negative S (largest mass decrease per +Δz_s):")
-        for r in valid_rows_sorted[:k]:
-            print("  %-20s  S=% .6f  z_l=%.3f  z_s=%.3f  thetaE=%.3f arcsec" %
-                  (r["lens_id"], float(r["S_dlnM_dzs"]), float(r["z_l"]), float(r["z_s"]), float(r["theta_E_arcsec"])))
+        for i in order[:k]:
+            print(_line(i))
 
         print("\nMost positive S (largest mass increase per +Δz_s):")
-        for r in valid_rows_sorted[-k:][::-1]:
-            print("  %-20s  S=% .6f  z_l=%.3f  z_s=%.3f  thetaE=%.3f arcsec" %
-                  (r["lens_id"], float(r["S_dlnM_dzs"]), float(r["z_l"]), float(r["z_s"]), float(r["theta_E_arcsec"])))
+        for i in order[-k:][::-1]:
+            print(_line(i))
     else:
         print("\nNo valid systems with finite S found to rank.")
 
@@ -9,13 +9,18 @@ Writes:
   outputs/slacs_results.csv
   outputs/slacs_report.txt
 
+  Set USE_ARROW_IO=1 to write the CSV with pyarrow instead of pandas,
+  USE_POLARS_IO=1 to read the input with polars, and N_JOBS (e.g. -1 for all
+  cores) to split large catalogues across processes.
+
 Usage (from project root):
   python scripts/run_slacs.py
 
 Notes:
   - This script assumes your ingest created columns:
       slacs_id, theta_E_arcsec, z_l, z_s, Good, Ring, ...
-  - Sensitivity is computed via src.sensitivity.compute_sensitivity.
+  - Sensitivity is computed via src.sensitivity.compute_sensitivity_batch
+    (one vectorized pass; same flags and semantics as compute_sensitivity).
 """
 
 from __future__ import annotations
@@ -27,6 +32,25 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
+# Optional Arrow CSV writer (opt in with USE_ARROW_IO=1; pandas otherwise)
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except Exception:
+    pa = None
+
+# Optional polars CSV reader (opt in with USE_POLARS_IO=1; pandas otherwise)
+try:
+    import polars as pl
+except Exception:
+    pl = None
+
+# Optional joblib for N_JOBS != 1 (concurrent.futures otherwise)
+try:
+    from joblib import Parallel, delayed
+except Exception:
+    Parallel = None
+
 # ---------------------------------------------------------------------
 # Ensure `import src.*` works when running as a script:
 # project_root/scripts/run_slacs.py -> add project_root to sys.path
@@ -36,16 +60,72 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.cosmology import FlatLambdaCDM  # noqa: E402
-from src.sensitivity import compute_sensitivity  # noqa: E402
+from src.sensitivity import SensitivityBatchResult, compute_sensitivity_batch  # noqa: E402
+
+
+def _as_float_array(col: pd.Series) -> np.ndarray:
+    # Non-numeric / missing entries become NaN (flagged by validation)
+    return pd.to_numeric(col, errors="coerce").to_numpy(dtype=float)
+
+
+REQUIRED_COLUMNS = ["slacs_id", "theta_E_arcsec", "z_l", "z_s"]
+PROVENANCE_COLUMNS = ["Good", "Ring", "name_table4", "name_table5"]
+CHUNK_ROWS = 256
+
+
+def _read_input(path: Path) -> pd.DataFrame:
+    """
+    Read only the columns main() uses (required + provenance, where present);
+    the joined table carries many more that are never looked at.
+    """
+    wanted = set(REQUIRED_COLUMNS + PROVENANCE_COLUMNS)
+    if pl is not None and os.environ.get("USE_POLARS_IO") == "1":
+        header = pl.read_csv(path, n_rows=0).columns
+        cols = [c for c in header if c in wanted]
+        return pl.read_csv(path, columns=cols, infer_schema_length=None).to_pandas()
+    return pd.read_csv(path, usecols=lambda c: c in wanted)
 
 
-def _as_float(x):
-    try:
-        if pd.isna(x):
-            return np.nan
-        return float(x)
-    except Exception:
-        return np.nan
+def _batch_chunk(thetaE, zl, zs, H0, Om0, h, delta_z):
+    # Worker entry point: each process builds its own cosmology (and D_C table)
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=H0, Om0=Om0)
+    return compute_sensitivity_batch(thetaE, zl, zs, cosmo, h=h, delta_z=delta_z)
+
+
+def _compute(thetaE, zl, zs, H0, Om0, h, delta_z, n_jobs):
+    """
+    compute_sensitivity_batch over all rows; with n_jobs != 1, over
+    contiguous CHUNK_ROWS-row chunks in worker processes (n_jobs=-1: all
+    cores), concatenated back in input order.
+    """
+    n = len(thetaE)
+    if n_jobs == 1 or n <= CHUNK_ROWS:
+        return _batch_chunk(thetaE, zl, zs, H0, Om0, h, delta_z)
+
+    bounds = range(0, n, CHUNK_ROWS)
+    args = [(thetaE[i:i + CHUNK_ROWS], zl[i:i + CHUNK_ROWS], zs[i:i + CHUNK_ROWS],
+             H0, Om0, h, delta_z) for i in bounds]
+    if Parallel is not None:
+        parts = Parallel(n_jobs=n_jobs, backend="loky")(delayed(_batch_chunk)(*a) for a in args)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        workers = None if n_jobs < 0 else n_jobs
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(_batch_chunk, *zip(*args)))
+    return SensitivityBatchResult(*(np.concatenate(f) for f in zip(*parts)))
+
+
+def _write_csv(cols: dict, path: Path) -> None:
+    """
+    Write result columns to CSV. With USE_ARROW_IO=1 (and pyarrow
+    installed) the arrays go straight to Arrow's C++ writer; otherwise via
+    pandas.
+    """
+    if pa is not None and os.environ.get("USE_ARROW_IO", "0") == "1":
+        table = pa.Table.from_pydict({k: pa.array(v, from_pandas=True) for k, v in cols.items()})
+        pacsv.write_csv(table, str(path), pacsv.WriteOptions(quoting_style="needed"))
+        return
+    pd.DataFrame(cols).to_csv(path, index=False)
 
 
 def main() -> None:
@@ -59,11 +139,10 @@ def main() -> None:
     if not input_path.exists():
         raise SystemExit(f"Missing input: {input_path}\nRun: python scripts/ingest_slacs.py")
 
-    df = pd.read_csv(input_path)
+    df = _read_input(input_path)
 
     # Minimal column expectations
-    required = ["slacs_id", "theta_E_arcsec", "z_l", "z_s"]
-    missing = [c for c in required if c not in df.columns]
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
     if missing:
         raise SystemExit(f"Input is missing required columns: {missing}\nFound: {list(df.columns)}")
 
@@ -72,67 +151,47 @@ def main() -> None:
     Om0 = float(os.environ.get("OM0", "0.3"))
     h = float(os.environ.get("FD_H", "1e-3"))
     delta_z = float(os.environ.get("DELTA_Z", "0.1"))
+    n_jobs = int(os.environ.get("N_JOBS", "1"))
 
-    cosmo = FlatLambdaCDM(H0_km_s_Mpc=H0, Om0=Om0)
+    thetaE = _as_float_array(df["theta_E_arcsec"])
+    zl = _as_float_array(df["z_l"])
+    zs = _as_float_array(df["z_s"])
 
-    rows = []
-    flag_counts = {}
+    res = _compute(thetaE, zl, zs, H0, Om0, h, delta_z, n_jobs)
+
+    is_valid = res.is_valid
+    flags = res.flags
 
     n_total = len(df)
-    n_valid = 0
-    n_invalid = 0
-
-    for _, r in df.iterrows():
-        lens_id = str(r["slacs_id"])
-
-        thetaE = _as_float(r["theta_E_arcsec"])
-        zl = _as_float(r["z_l"])
-        zs = _as_float(r["z_s"])
-
-        res = compute_sensitivity(
-            theta_E_arcsec=thetaE,
-            z_l=zl,
-            z_s=zs,
-            cosmo=cosmo,
-            h=h,
-            delta_z=delta_z,
-        )
-
-        is_valid = bool(res.get("is_valid", False))
-        flags = res.get("flags", []) or []
-        if isinstance(flags, str):
-            flags = [flags] if flags else []
-
-        if is_valid:
-            n_valid += 1
-        else:
-            n_invalid += 1
-
-        for f in flags:
+    n_valid = int(is_valid.sum())
+    n_invalid = n_total - n_valid
+
+    flag_counts = {}
+    for fl in flags:
+        for f in fl:
             flag_counts[f] = flag_counts.get(f, 0) + 1
 
-        out = {
-            "lens_id": lens_id,
-            "theta_E_arcsec": thetaE,
-            "z_l": zl,
-            "z_s": zs,
-            "is_valid": is_valid,
-            "flags": ";".join(flags),
-            # Key outputs from compute_sensitivity
-            "S_dlnM_dzs": res.get("S_dlnM_dzs", np.nan),
-            "dM_over_M_for_delta_z": res.get("dM_over_M_for_delta_z", np.nan),
-            "M_inf_Msun": res.get("M_inf_Msun", np.nan),
-        }
-
-        # Carry through any useful provenance columns if present
-        for col in ("Good", "Ring", "name_table4", "name_table5"):
-            if col in df.columns:
-                out[col] = r[col]
-
-        rows.append(out)
-
-    out_df = pd.DataFrame(rows)
-    out_df.to_csv(out_csv, index=False)
+    out_cols = {
+        "lens_id": df["slacs_id"].astype(str).to_numpy(),
+        "theta_E_arcsec": thetaE,
+        "z_l": zl,
+        "z_s": zs,
+        "is_valid": is_valid,
+        "flags": [";".join(fl) for fl in flags],
+        # Key outputs from compute_sensitivity_batch
+        "S_dlnM_dzs": res.S_dlnM_dzs,
+        "dM_over_M_for_delta_z": res.dM_over_M_for_delta_z,
+        # compute_sensitivity_batch reports M_inf in kg only; column kept empty
+        "M_inf_Msun": np.full(n_total, np.nan),
+    }
+
+    # Carry through any useful provenance columns if present
+    for col in PROVENANCE_COLUMNS:
+        if col in df.columns:
+            out_cols[col] = df[col].to_numpy()
+
+    _write_csv(out_cols, out_csv)
+    out_df = pd.DataFrame(out_cols)
 
     # Report
     report_lines = []
@@ -156,21 +215,22 @@ def main() -> None:
     valid = out_df[out_df["is_valid"] == True].copy()
     if len(valid) > 0 and "S_dlnM_dzs" in valid.columns:
         valid = valid.sort_values("S_dlnM_dzs", ascending=True)
+        rank_cols = ["lens_id", "S_dlnM_dzs", "z_l", "z_s", "theta_E_arcsec"]
+
+        def _rank_lines(frame):
+            # Plain tuples (no per-row Series); columns are already float.
+            return [
+                f"  {lens_id:<12}  S={S:.6f}  "
+                f"z_l={z_l:.3f}  z_s={z_s:.3f}  thetaE={thetaE:.3f} arcsec"
+                for lens_id, S, z_l, z_s, thetaE in frame[rank_cols].itertuples(index=False, name=None)
+            ]
 
         report_lines.append("Most negative S (largest mass decrease per +Δz_s):")
-        for _, rr in valid.head(10).iterrows():
-            report_lines.append(
-                f"  {rr['lens_id']:<12}  S={rr['S_dlnM_dzs']:.6f}  "
-                f"z_l={rr['z_l']:.3f}  z_s={rr['z_s']:.3f}  thetaE={rr['theta_E_arcsec']:.3f} arcsec"
-            )
+        report_lines.extend(_rank_lines(valid.head(10)))
 
         report_lines.append("")
         report_lines.append("Least negative / most positive S:")
-        for _, rr in valid.tail(10).sort_values("S_dlnM_dzs", ascending=False).iterrows():
-            report_lines.append(
-                f"  {rr['lens_id']:<12}  S={rr['S_dlnM_dzs']:.6f}  "
-                f"z_l={rr['z_l']:.3f}  z_s={rr['z_s']:.3f}  thetaE={rr['theta_E_arcsec']:.3f} arcsec"
-            )
+        report_lines.extend(_rank_lines(valid.tail(10).sort_values("S_dlnM_dzs", ascending=False)))
 
     out_report.write_text("\n".join(report_lines), encoding="utf-8")
 
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+numba fastmath flags shared by the jitted kernels.
+
+Without "nnan"/"ninf", so the NaN/isfinite guards in the kernels are not
+folded away, and without "afn"/"arcp", so log/pow/sqrt and divisions are not
+replaced by approximations: the remaining flags only let the compiler
+reorder and fuse arithmetic, which keeps the compiled kernels within rounding
+(~1e-12 relative, see tests/test_cosmology.py) of their plain-Python fallback.
+"""
+
+FASTMATH = {"reassoc", "contract", "nsz"}
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Scalar math of compute_sensitivity() after validation and the cosmology calls.
+
+Takes the angular Einstein radius, D_l and Σ_crit at z_s, z_s ± h and z_s ± 2h
+(NaN for the ±2h pair unless the four-point stencil is wanted), plus S_exact,
+an already known S (analytic derivative; NaN to use the finite differences),
+and returns (M_inf, S, ΔM/M, code), where code is one of the CODE_* outcomes
+below (a float, so the result is a homogeneous tuple). With numba available
+this is compiled once, at import, for float64 arguments (cache=True keeps the
+machine code on disk); otherwise it runs as plain Python.
+"""
+
+from __future__ import division
+
+import math
+
+from src._fastmath import FASTMATH
+
+# Optional numba (plain Python fallback).
+try:
+    from numba import njit
+except Exception:
+    njit = None
+
+# Outcome codes: finite-difference scheme used, or the first failing check.
+CODE_CENTRAL = 0
+CODE_FORWARD = 1
+CODE_BACKWARD = 2
+CODE_NONFINITE_D_L = 3
+CODE_NONFINITE_SIGMA_CRIT = 4
+CODE_NONFINITE_M_INF = 5
+CODE_NONFINITE_S = 6
+
+
+def _sensitivity_kernel(theta_rad, D_l, Sigma, Sigma_p, Sigma_m, Sigma_p2, Sigma_m2,
+                        S_exact, h, delta_z):
+    # Local binds: LOAD_FAST in the plain Python fallback; numba resolves
+    # them to the same intrinsics as math.<name>.
+    nan = math.nan
+    pi = math.pi
+    log = math.log
+    isfinite = math.isfinite
+
+    if not (isfinite(D_l) and D_l > 0.0):
+        return nan, nan, nan, float(CODE_NONFINITE_D_L)
+    if not (isfinite(Sigma) and Sigma > 0.0):
+        return nan, nan, nan, float(CODE_NONFINITE_SIGMA_CRIT)
+
+    # M_inf(<θE; zs) = π (D_l θ_E)^2 Σ_crit
+    R = D_l * theta_rad
+    M_inf = pi * (R ** 2) * Sigma
+    if not (isfinite(M_inf) and M_inf > 0.0):
+        return M_inf, nan, nan, float(CODE_NONFINITE_M_INF)
+
+    # S = d ln Σ_crit / dz_s: S_exact when given, else the Richardson-
+    # extrapolated four-point central difference (O(h^4)) when all of
+    # z_s ± h, z_s ± 2h are defined, else the two-point central difference
+    # (O(h^2)), else one-sided (prefer forward) where a stencil point is
+    # undefined (z_s - h <= z_l). Each difference of logs is taken as one log
+    # of the ratio; Σ_crit(z_s) is already known to be finite and positive.
+    ok_p = isfinite(Sigma_p) and Sigma_p > 0.0
+    ok_m = isfinite(Sigma_m) and Sigma_m > 0.0
+    ok_2 = (isfinite(Sigma_p2) and Sigma_p2 > 0.0
+            and isfinite(Sigma_m2) and Sigma_m2 > 0.0)
+
+    if S_exact == S_exact:
+        S = S_exact
+        code = float(CODE_CENTRAL)
+    elif ok_p and ok_m and ok_2:
+        S = (8.0 * log(Sigma_p / Sigma_m)
+             - log(Sigma_p2 / Sigma_m2)) / (12.0 * h)
+        code = float(CODE_CENTRAL)
+    elif ok_p and ok_m:
+        S = log(Sigma_p / Sigma_m) / (2.0 * h)
+        code = float(CODE_CENTRAL)
+    elif ok_p:
+        S = log(Sigma_p / Sigma) / h
+        code = float(CODE_FORWARD)
+    elif ok_m:
+        S = log(Sigma / Sigma_m) / h
+        code = float(CODE_BACKWARD)
+    else:
+        return M_inf, nan, nan, float(CODE_NONFINITE_S)
+
+    if not isfinite(S):
+        return M_inf, S, nan, float(CODE_NONFINITE_S)
+    return M_inf, S, S * delta_z, code
+
+
+if njit is not None:
+    _sensitivity_kernel = njit(
+        "UniTuple(f8, 4)(f8, f8, f8, f8, f8, f8, f8, f8, f8, f8)",
+        cache=True,
+        fastmath=FASTMATH,
+    )(_sensitivity_kernel)
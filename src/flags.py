@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Integer flag types over the existing flag bit layouts.
+
+ValidationFlag has one member per src.validate.VALIDATION_FLAGS entry (same
+bit), and SensitivityFlag one per src.sensitivity.FLAG_NAMES entry (the
+compute_sensitivity_batch() flag_bits layout: raw-input flags first, then the
+kernel flags). Member names are the flag strings without the 'flag_' prefix,
+upper-cased, e.g. 'flag_zs_le_zl' -> SensitivityFlag.ZS_LE_ZL.
+
+Results keep their list/tuple of flag strings; these types are for callers
+that prefer integer tests, e.g.
+
+    bad = (out.flag_bits & SensitivityFlag.NONFINITE_SIGMA_CRIT) != 0
+    SensitivityFlag.USED_FORWARD_DIFF in SensitivityFlag(int(out.flag_bits[i]))
+"""
+
+from enum import IntFlag
+
+from src.sensitivity import FLAG_NAMES
+from src.validate import VALIDATION_FLAGS
+
+
+def _members(names):
+    return [(name[len('flag_'):].upper(), 1 << i) for i, name in enumerate(names)]
+
+
+ValidationFlag = IntFlag('ValidationFlag', _members(VALIDATION_FLAGS), module=__name__)
+SensitivityFlag = IntFlag('SensitivityFlag', _members(FLAG_NAMES), module=__name__)
+
+_NAME_BY_BIT = dict((1 << i, name) for i, name in enumerate(FLAG_NAMES))
+
+
+def from_strings(flags, cls=SensitivityFlag):
+    """Flag value with the bits of a list/tuple of flag strings set."""
+    value = 0
+    for name in flags:
+        value |= 1 << FLAG_NAMES.index(name)
+    return cls(value)
+
+
+def to_legacy_strings(flag):
+    """Flag strings (in bit order, i.e. the order results list them) of a flag value or bitmask."""
+    bits = int(flag)
+    names = []
+    while bits:
+        low = bits & -bits
+        names.append(_NAME_BY_BIT[low])
+        bits ^= low
+    return names
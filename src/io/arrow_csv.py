@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pandas as pd
+
+# Optional pyarrow (only needed by read_csv).
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except Exception:
+    pa = None
+    pacsv = None
+
+# pandas.read_csv's default NA strings; Arrow's own default list lacks
+# "None" and "<NA>", which would otherwise read as non-numeric text.
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
+
+
+def read_csv(path, float_columns=()) -> pd.DataFrame:
+    """
+    Read a CSV with Arrow's multithreaded reader into a pandas DataFrame.
+
+    Columns named in `float_columns` are parsed straight to float64; all
+    others are inferred (not forced), so non-numeric entries survive to
+    validation rather than aborting the read. Empty cells and NA_VALUES are
+    null, as with pandas.read_csv.
+    """
+    if pacsv is None:
+        raise ImportError("read_csv requires pyarrow.")
+    tbl = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.float64() for c in float_columns},
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    return tbl.to_pandas()
@@ -37,7 +37,8 @@ The primary sensitivity metric implemented here is the logarithmic derivative:
            = ∂ ln Σ_crit(z_l, z_s) / ∂ z_s
 
 In practice, S(z_s) is evaluated using a fixed central finite-difference
-scheme with a pre-specified step size h.
+scheme with a pre-specified step size h. A closed form (docs/metric.md,
+"Analytic Evaluation") is available as an alternative scheme.
 
 Interpretation
 --------------
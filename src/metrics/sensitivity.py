@@ -1,44 +1,83 @@
-cat > src/metrics/sensitivity.py <<'PY'
 from __future__ import annotations
+import math
+
 import numpy as np
 
+from src.cosmology import _comoving_distance_table, _hermite_lookup
+
 C = 299792458.0
 G = 6.67430e-11
-ARCSEC_TO_RAD = np.deg2rad(1/3600)
+ARCSEC_TO_RAD = math.pi / (180.0 * 3600.0)  # plain float (same value as np.deg2rad(1/3600))
 
 def E(z: float, Om0: float) -> float:
     return np.sqrt(Om0*(1+z)**3 + (1-Om0))
 
-def comoving_distance(z: float, H0: float, Om0: float, n: int = 4096) -> float:
-    if z <= 0:
-        return 0.0
+# D_C(z) H0/c comes from the shared src.cosmology table over [0, _Z_TAB_MAX]
+# (same nodes and cache as a default FlatLambdaCDM; H0 only scales the
+# result); redshifts beyond it are integrated directly.
+_Z_TAB_MAX = 10.0
+_N_TAB = 4096
+
+def _dc_table(Om0: float):
+    return _comoving_distance_table(Om0, 1.0 - Om0, _Z_TAB_MAX, _N_TAB)
+
+def _dc_simpson(z: float, Om0: float, n: int) -> float:
     if n % 2 == 1:
         n += 1
     zs = np.linspace(0.0, z, n+1)
     f = 1.0 / E(zs, Om0)
     h = z / n
     S = f[0] + f[-1] + 4*np.sum(f[1:-1:2]) + 2*np.sum(f[2:-2:2])
-    integral = (h/3.0) * S
-    return (C / H0) * integral  # meters
+    return (h/3.0) * S
+
+def comoving_distance(z: float, H0: float, Om0: float, n: int = 4096) -> float:
+    # z may be a float or an array; n is the Simpson interval count used
+    # beyond the tabulated range.
+    tab, dtab, dz = _dc_table(float(Om0))
+    if np.ndim(z) == 0:
+        if z <= 0:
+            return 0.0
+        if z <= _Z_TAB_MAX:
+            return (C / H0) * float(_hermite_lookup(float(z), tab, dtab, dz))
+        return (C / H0) * _dc_simpson(z, Om0, n)  # meters
+    z = np.asarray(z, dtype=float)
+    inside = (z > 0) & (z <= _Z_TAB_MAX)
+    out = np.where(inside, _hermite_lookup(np.where(inside, z, 0.0), tab, dtab, dz), 0.0)
+    for k in np.flatnonzero(~inside & ~(z <= 0)):  # beyond the table, or NaN
+        out.flat[k] = _dc_simpson(z.flat[k], Om0, n)
+    return (C / H0) * out  # meters
 
 def angular_diameter_distance(z: float, H0: float, Om0: float) -> float:
     Dc = comoving_distance(z, H0, Om0)
     return Dc / (1.0 + z)
 
 def angular_diameter_distance_z1z2(z1: float, z2: float, H0: float, Om0: float) -> float:
-    if z2 <= z1:
-        return np.nan
+    if np.ndim(z1) == 0 and np.ndim(z2) == 0:
+        if z2 <= z1:
+            return np.nan
+        Dc1 = comoving_distance(z1, H0, Om0)
+        Dc2 = comoving_distance(z2, H0, Om0)
+        return (Dc2 - Dc1) / (1.0 + z2)
     Dc1 = comoving_distance(z1, H0, Om0)
     Dc2 = comoving_distance(z2, H0, Om0)
-    return (Dc2 - Dc1) / (1.0 + z2)
+    return np.where(np.greater(z2, z1), (Dc2 - Dc1) / (1.0 + np.asarray(z2)), np.nan)
 
 def sigma_crit(zl: float, zs: float, H0: float, Om0: float) -> float:
     Dl = angular_diameter_distance(zl, H0, Om0)
     Ds = angular_diameter_distance(zs, H0, Om0)
     Dls = angular_diameter_distance_z1z2(zl, zs, H0, Om0)
-    if not np.isfinite(Dls) or Dls <= 0 or Dl <= 0 or Ds <= 0:
-        return np.nan
-    return (C**2/(4*np.pi*G)) * (Ds / (Dl * Dls))
+    if np.ndim(Dls) == 0:
+        # Scalar (per-row) call: chained comparisons beat ufuncs on 0-d
+        # values, and NaN fails every one of them.
+        if not (0 < Dl < np.inf and 0 < Ds < np.inf and 0 < Dls < np.inf):
+            return np.nan
+        return (C**2/(4*np.pi*G)) * (Ds / (Dl * Dls))
+    # Arrays: one fused validity mask instead of per-row branches.
+    valid = ((Dl > 0) & (Ds > 0) & (Dls > 0)
+             & np.isfinite(Dl) & np.isfinite(Ds) & np.isfinite(Dls))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sig = (C**2/(4*np.pi*G)) * (Ds / (Dl * Dls))
+    return np.where(valid, sig, np.nan)
 
 def Minf(thetaE_arcsec: float, zl: float, zs: float, H0: float, Om0: float) -> float:
     Dl = angular_diameter_distance(zl, H0, Om0)
@@ -51,8 +90,28 @@ def Minf(thetaE_arcsec: float, zl: float, zs: float, H0: float, Om0: float) -> f
     R = Dl * theta
     return np.pi * (R**2) * Sig
 
+def dlnSigma_dzs(zl: float, zs: float, H0: float, Om0: float) -> float:
+    # Analytic d ln Sigma_crit / dz_s = f'/f - f'/(f - Dc_l), f = Dc(zs), f' = (C/H0)/E(zs)
+    if zs <= zl:
+        return np.nan
+    Dcl = comoving_distance(zl, H0, Om0)
+    Dcs = comoving_distance(zs, H0, Om0)
+    if not np.isfinite(Dcs) or Dcs <= 0 or Dcs - Dcl <= 0:
+        return np.nan
+    dDcs = (C / H0) / E(zs, Om0)
+    return dDcs / Dcs - dDcs / (Dcs - Dcl)
+
 def dlnM_dzs(thetaE_arcsec: float, zl: float, zs: float, H0: float, Om0: float,
-             dz: float = 1e-3) -> float:
+             dz: float = 1e-3, method: str = "fd") -> float:
+    # method="fd": finite difference in z_s (docs/metric.md, section 4);
+    # method="analytic": dlnSigma_dzs (theta_E and D_l drop out), no dz.
+    if method == "analytic":
+        # Same domain as the fd branch: M must be finite and nonzero (D_l > 0)
+        if not (zl > 0 and np.isfinite(thetaE_arcsec) and thetaE_arcsec != 0):
+            return np.nan
+        return dlnSigma_dzs(zl, zs, H0, Om0)
+    if method != "fd":
+        raise ValueError(f"unknown method: {method!r}")
     z1 = zs - dz
     z2 = zs + dz
     if z1 <= zl + 1e-6:
@@ -63,5 +122,3 @@ def dlnM_dzs(thetaE_arcsec: float, zl: float, zs: float, H0: float, Om0: float,
     if not np.isfinite(M1) or not np.isfinite(M2) or M1 <= 0 or M2 <= 0:
         return np.nan
     return (np.log(M2) - np.log(M1)) / (z2 - z1)
-PY
-
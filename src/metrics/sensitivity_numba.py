@@ -0,0 +1,106 @@
+from __future__ import annotations
+import math
+import numpy as np
+
+from src._fastmath import FASTMATH
+from src.metrics.sensitivity import C, G, ARCSEC_TO_RAD
+
+# Optional numba; without it the same code runs as plain (slow) Python.
+try:
+    from numba import njit, prange
+except Exception:
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
+# Numba ports of the formulas in src/metrics/sensitivity.py (same signatures,
+# same guards). Distances are in meters, H0 in s^-1.
+
+@njit(cache=True, fastmath=FASTMATH)
+def E(z: float, Om0: float) -> float:
+    return math.sqrt(Om0*(1+z)**3 + (1-Om0))
+
+@njit(cache=True, fastmath=FASTMATH)
+def comoving_distance(z: float, H0: float, Om0: float, n: int = 4096) -> float:
+    if z <= 0:
+        return 0.0
+    if n % 2 == 1:
+        n += 1
+    # Simpson's rule as a plain loop: no per-call array allocation.
+    h = z / n
+    s1 = 0.0
+    s2 = 0.0
+    for i in range(1, n, 2):
+        s1 += 1.0 / E(i*h, Om0)
+    for i in range(2, n - 1, 2):
+        s2 += 1.0 / E(i*h, Om0)
+    S = 1.0 / E(0.0, Om0) + 1.0 / E(z, Om0) + 4*s1 + 2*s2
+    return (C / H0) * (h/3.0) * S  # meters
+
+@njit(cache=True, fastmath=FASTMATH)
+def angular_diameter_distance(z: float, H0: float, Om0: float) -> float:
+    return comoving_distance(z, H0, Om0) / (1.0 + z)
+
+@njit(cache=True, fastmath=FASTMATH)
+def angular_diameter_distance_z1z2(z1: float, z2: float, H0: float, Om0: float) -> float:
+    if z2 <= z1:
+        return np.nan
+    Dc1 = comoving_distance(z1, H0, Om0)
+    Dc2 = comoving_distance(z2, H0, Om0)
+    return (Dc2 - Dc1) / (1.0 + z2)
+
+@njit(cache=True, fastmath=FASTMATH)
+def sigma_crit(zl: float, zs: float, H0: float, Om0: float) -> float:
+    Dl = angular_diameter_distance(zl, H0, Om0)
+    Ds = angular_diameter_distance(zs, H0, Om0)
+    Dls = angular_diameter_distance_z1z2(zl, zs, H0, Om0)
+    if not np.isfinite(Dls) or Dls <= 0 or Dl <= 0 or Ds <= 0:
+        return np.nan
+    return (C**2/(4*np.pi*G)) * (Ds / (Dl * Dls))
+
+@njit(cache=True, fastmath=FASTMATH)
+def Minf(thetaE_arcsec: float, zl: float, zs: float, H0: float, Om0: float) -> float:
+    Dl = angular_diameter_distance(zl, H0, Om0)
+    if not np.isfinite(Dl) or Dl <= 0:
+        return np.nan
+    theta = thetaE_arcsec * ARCSEC_TO_RAD
+    Sig = sigma_crit(zl, zs, H0, Om0)
+    if not np.isfinite(Sig):
+        return np.nan
+    R = Dl * theta
+    return np.pi * (R**2) * Sig
+
+@njit(cache=True, fastmath=FASTMATH)
+def dlnM_dzs(thetaE_arcsec: float, zl: float, zs: float, H0: float, Om0: float,
+             dz: float = 1e-3) -> float:
+    z1 = zs - dz
+    z2 = zs + dz
+    if z1 <= zl + 1e-6:
+        z1 = zs
+        z2 = zs + 2*dz
+    M1 = Minf(thetaE_arcsec, zl, z1, H0, Om0)
+    M2 = Minf(thetaE_arcsec, zl, z2, H0, Om0)
+    if not np.isfinite(M1) or not np.isfinite(M2) or M1 <= 0 or M2 <= 0:
+        return np.nan
+    return (np.log(M2) - np.log(M1)) / (z2 - z1)
+
+@njit(cache=True, parallel=True, fastmath=FASTMATH)
+def dlnM_dzs_batch(thetaE_arcsec, zl, zs, H0: float, Om0: float, dz: float = 1e-3):
+    """
+    dlnM_dzs and Minf over 1-D float64 arrays, one lens per element, run in
+    parallel over lenses. Returns (S, dlnM, Minf) where S = |dlnM| (NaN where
+    dlnM is not finite).
+    """
+    n = thetaE_arcsec.shape[0]
+    S = np.empty(n)
+    dlnM = np.empty(n)
+    M = np.empty(n)
+    for i in prange(n):
+        d = dlnM_dzs(thetaE_arcsec[i], zl[i], zs[i], H0, Om0, dz)
+        dlnM[i] = d
+        S[i] = abs(d) if np.isfinite(d) else np.nan
+        M[i] = Minf(thetaE_arcsec[i], zl[i], zs[i], H0, Om0)
+    return S, dlnM, M
@@ -1,5 +1,5 @@
-cat > src/plots/report.py <<'PY'
 from __future__ import annotations
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -9,44 +9,55 @@ def _savefig(path: str):
     plt.savefig(path)
     plt.close()
 
-def fig1_hist_S(df: pd.DataFrame, outpath: str):
-    x = df["S_log"].to_numpy()
-    x = x[np.isfinite(x)]
+def _prep(df: pd.DataFrame):
+    """
+    Extract the figure inputs once: (S, zsep, zl, dlnM, mask), where mask
+    marks rows with finite S_log, z_l, z_s and delta_lnM_0p1, and the four
+    arrays are the dense, contiguous float64 values at those rows.
+    """
+    S = df["S_log"].to_numpy(dtype=float, copy=False)
+    zl = df["z_l"].to_numpy(dtype=float, copy=False)
+    zsep = df["z_s"].to_numpy(dtype=float, copy=False) - zl
+    dlnM = df["delta_lnM_0p1"].to_numpy(dtype=float, copy=False)
+    mask = np.isfinite(S) & np.isfinite(zsep) & np.isfinite(dlnM)  # zsep covers z_l
+    return S[mask], zsep[mask], zl[mask], dlnM[mask], mask
+
+def fig1_hist_S(S: np.ndarray, outpath: str):
     plt.figure()
-    plt.hist(x, bins=40)
+    plt.hist(S, bins=40)
     plt.xlabel(r"$S = |\partial \ln M / \partial z_s|$")
     plt.ylabel("Count")
     _savefig(outpath)
 
-def fig2_scatter_S_vs_zsep(df: pd.DataFrame, outpath: str):
-    x = (df["z_s"] - df["z_l"]).to_numpy()
-    y = df["S_log"].to_numpy()
-    m = np.isfinite(x) & np.isfinite(y)
+def fig2_scatter_S_vs_zsep(zsep: np.ndarray, S: np.ndarray, outpath: str):
     plt.figure()
-    plt.scatter(x[m], y[m], s=10)
+    plt.scatter(zsep, S, s=10)
     plt.xlabel(r"$z_s - z_l$")
     plt.ylabel(r"$S$")
     _savefig(outpath)
 
-def fig3_scatter_S_vs_zl(df: pd.DataFrame, outpath: str):
-    x = df["z_l"].to_numpy()
-    y = df["S_log"].to_numpy()
-    m = np.isfinite(x) & np.isfinite(y)
+def fig3_scatter_S_vs_zl(zl: np.ndarray, S: np.ndarray, outpath: str):
     plt.figure()
-    plt.scatter(x[m], y[m], s=10)
+    plt.scatter(zl, S, s=10)
     plt.xlabel(r"$z_l$")
     plt.ylabel(r"$S$")
     _savefig(outpath)
 
-def fig4_bias_proxy(df: pd.DataFrame, outpath: str):
-    x = df["delta_lnM_0p1"].to_numpy()
-    x = x[np.isfinite(x)]
+def fig4_bias_proxy(dlnM: np.ndarray, outpath: str):
     plt.figure()
-    plt.hist(x, bins=40)
+    plt.hist(dlnM, bins=40)
     plt.xlabel(r"$|\Delta \ln M|$ for $\Delta z_s = 0.1$")
     plt.ylabel("Count")
     _savefig(outpath)
 
+def write_figures(df: pd.DataFrame, figdir: str):
+    """Figures 1-4 from one pass over df (see _prep)."""
+    S, zsep, zl, dlnM, _ = _prep(df)
+    fig1_hist_S(S, os.path.join(figdir, "fig1_hist_S.pdf"))
+    fig2_scatter_S_vs_zsep(zsep, S, os.path.join(figdir, "fig2_S_vs_zs_minus_zl.pdf"))
+    fig3_scatter_S_vs_zl(zl, S, os.path.join(figdir, "fig3_S_vs_zl.pdf"))
+    fig4_bias_proxy(dlnM, os.path.join(figdir, "fig4_hist_dlnM_dz0p1.pdf"))
+
 def table1_summary(df: pd.DataFrame) -> pd.DataFrame:
     n_total = len(df)
     n_valid = int(df["is_valid"].sum())
@@ -66,5 +77,3 @@ def table2_top_sensitive(df: pd.DataFrame, k: int = 20) -> pd.DataFrame:
     cols = ["lens_id","z_l","z_s","z_s_type","theta_E_arcsec","S_log","delta_lnM_0p1","catalog","ref"]
     cols = [c for c in cols if c in d.columns]
     return d[cols]
-PY
-
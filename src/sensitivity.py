@@ -10,37 +10,232 @@ Implements the per-lens computation specified in docs/metric.md:
 Primary sensitivity metric:
     S(z_s) = ∂ ln M_inf / ∂ z_s = ∂ ln Σ_crit / ∂ z_s
 
-Finite difference (central):
+Finite difference (central, stencil='central2'):
     S(z_s) ≈ [ln Σ(z_s+h) - ln Σ(z_s-h)] / (2h)
 
+or Richardson-extrapolated (stencil='richardson4', O(h^4)):
+    S(z_s) ≈ [8 (ln Σ(z_s+h) - ln Σ(z_s-h)) - (ln Σ(z_s+2h) - ln Σ(z_s-2h))] / (12h)
+
+or analytic (derivative='analytic'; f = D_C(z_s), f' = dD_C/dz = (c/H0)/E(z_s)):
+    S(z_s) = f'/f - f'/(f - D_C(z_l))
+
 Bias mapping:
     ΔM/M ≈ S(z_s) * Δz_s
 
 This module performs:
 - input validation (raw fields) via src.validate.validate_lens_inputs
 - computed-quantity validation (finite/positive Σ_crit, finite S)
+
+compute_sensitivity_batch() is the vectorized variant for catalogue-scale
+runs: it evaluates every distance in array calls (requires numpy).
+compute_sensitivity_catalogue() runs it on a LensCatalogue (one array per
+input field) and both return a SensitivityBatchResult (one array per output
+field); compute_sensitivity_vec() returns just its (S, flags, valid).
 """
 
 from __future__ import division
 
 import math
-
-from src.validate import validate_lens_inputs
+from math import isfinite
+from typing import NamedTuple
+
+# Optional numpy (only needed by the vectorized front-end).
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+from src._sensitivity_kernel import CODE_BACKWARD, _sensitivity_kernel
+from src.cosmology import C_LIGHT, G_NEWTON
+from src.validate import (
+    VALIDATION_FLAGS,
+    decode_validation_flags,
+    validate_lens_inputs,
+    validate_lens_inputs_batch,
+)
 
 ARCSEC_TO_RAD = (math.pi / 180.0) / 3600.0
 
-
-def _is_nan(x):
-    return x != x
-
-def _is_inf(x):
-    return x == float('inf') or x == float('-inf')
-
-def _is_finite(x):
-    return (x is not None) and (not _is_nan(x)) and (not _is_inf(x))
-
-
-def compute_sensitivity(theta_E_arcsec, z_l, z_s, cosmo, h=1e-3, delta_z=0.1):
+NAN = float('nan')
+
+# c^2 / (4πG), the Σ_crit prefactor (kg/m)
+_SIGMA_PREF = (C_LIGHT ** 2) / (4.0 * math.pi * G_NEWTON)
+
+# Finite-difference stencils accepted by compute_sensitivity(stencil=...).
+STENCILS = ('central2', 'richardson4')
+
+# How compute_sensitivity(derivative=...) obtains S: finite differences of
+# ln Σ_crit ('fd', the reference), or the closed form from dD_C/dz.
+DERIVATIVES = ('fd', 'analytic')
+
+# Flags raised by the kernel after raw-input validation. The kernel no longer
+# raises flag_nonfinite_lnSigma_at_zs (Σ_crit(z_s) is checked first, as
+# flag_nonfinite_Sigma_crit); it is kept so the flag_bits layout is unchanged.
+SENSITIVITY_FLAGS = (
+    'flag_invalid_h',
+    'flag_nonfinite_D_l',
+    'flag_nonfinite_Sigma_crit',
+    'flag_nonfinite_M_inf',
+    'flag_nonfinite_lnSigma_at_zs',
+    'flag_nonfinite_S',
+    'flag_used_forward_diff',
+    'flag_used_backward_diff',
+)
+
+# Flag for each src._sensitivity_kernel outcome code (None: central difference)
+_KERNEL_FLAGS = (
+    None,
+    'flag_used_forward_diff',
+    'flag_used_backward_diff',
+    'flag_nonfinite_D_l',
+    'flag_nonfinite_Sigma_crit',
+    'flag_nonfinite_M_inf',
+    'flag_nonfinite_S',
+)
+# The same as the flags tuple of a SensitivityResult (built once, not per call)
+_KERNEL_FLAG_TUPLES = tuple(() if f is None else (f,) for f in _KERNEL_FLAGS)
+
+# Per-row flag bitmask of compute_sensitivity_batch(): bit i is FLAG_NAMES[i]
+# (raw-input flags first). 24 flags, so the array dtype is uint32.
+FLAG_NAMES = VALIDATION_FLAGS + SENSITIVITY_FLAGS
+FLAG_BIT = dict((name, 1 << i) for i, name in enumerate(FLAG_NAMES))
+
+
+def _as_arrays(theta_E_arcsec, z_l, z_s):
+    th = np.asarray(theta_E_arcsec, dtype=float)
+    zl = np.asarray(z_l, dtype=float)
+    zs = np.asarray(z_s, dtype=float)
+    if not (th.shape == zl.shape == zs.shape) or th.ndim != 1:
+        raise ValueError("theta_E_arcsec, z_l and z_s must be 1-D arrays of equal length.")
+    return th, zl, zs
+
+
+def _validate_arrays(th, zl, zs):
+    """
+    Raw input validation as array masks (src.validate.validate_lens_inputs_batch),
+    with the flags and flag order of validate_lens_inputs. Returns
+    (flags, bad, bits): an object ndarray holding a list[str] for every
+    failing row (None elsewhere), the bool mask of failing rows, and the
+    uint32 FLAG_BIT bitmask per row.
+    """
+    valid, vbits = validate_lens_inputs_batch(th, zl, zs)
+    bad = ~valid
+    flags = np.empty(th.shape[0], dtype=object)
+    for i in np.flatnonzero(bad):
+        flags[i] = decode_validation_flags(vbits[i])
+    # Raw-input flags occupy the low bits of FLAG_BIT.
+    return flags, bad, vbits.astype(np.uint32)
+
+
+def _sigma_from_Dc(Dc_l, z_l, Dc_s, z_s):
+    """Σ_crit from comoving distances, with the guards of cosmo.sigma_crit."""
+    if z_s <= z_l:
+        return NAN
+    D_l = Dc_l / (1.0 + z_l)
+    D_s = Dc_s / (1.0 + z_s)
+    D_ls = (Dc_s - Dc_l) / (1.0 + z_s)
+    if not (isfinite(D_l) and isfinite(D_s) and isfinite(D_ls)):
+        return NAN
+    if D_l <= 0.0 or D_s <= 0.0 or D_ls <= 0.0:
+        return NAN
+    return _SIGMA_PREF * (D_s / (D_l * D_ls))
+
+
+def sigma_crit_fd(cosmo, z_l, z_s, h, Dc_l=None):
+    """
+    (Σ_crit(z_l, z_s - h), Σ_crit(z_l, z_s + h)) for the finite-difference
+    stencil, NaN where undefined (z_s - h <= z_l).
+
+    Shares the work of two sigma_crit() calls: D_C(z_l) is evaluated once
+    (or passed in as Dc_l by a caller that already has it), and D_C(z_s + h)
+    extends D_C(z_s - h) by a short integral over the 2h slice
+    (cosmo.comoving_distance_pair). A cosmology without comoving_distance_pair
+    gets one cosmo.sigma_crit() call per stencil point instead.
+    """
+    z_l = float(z_l)
+    z_m = float(z_s) - float(h)
+    z_p = float(z_s) + float(h)
+    if not hasattr(cosmo, 'comoving_distance_pair'):
+        sig_m = float(cosmo.sigma_crit(z_l, z_m)) if z_m > z_l else NAN
+        return sig_m, float(cosmo.sigma_crit(z_l, z_p))
+    if Dc_l is None:
+        Dc_l = cosmo.comoving_distance(z_l)
+    if z_m > z_l:
+        Dc_m, Dc_p = cosmo.comoving_distance_pair(z_m, z_p)
+        sig_m = _sigma_from_Dc(Dc_l, z_l, Dc_m, z_m)
+    else:
+        Dc_p = cosmo.comoving_distance(z_p)
+        sig_m = NAN
+    return sig_m, _sigma_from_Dc(Dc_l, z_l, Dc_p, z_p)
+
+
+class SensitivityResult(NamedTuple):
+    """Per-lens result of compute_sensitivity() (fixed field layout)."""
+    is_valid: bool
+    flags: tuple
+    theta_E_arcsec: float
+    z_l: float
+    z_s: float
+    theta_E_rad: float
+    D_l_m: float
+    Sigma_crit_kg_m2: float
+    M_inf_kg: float
+    S_dlnM_dzs: float
+    dM_over_M_for_delta_z: float
+
+
+class LensCatalogue(NamedTuple):
+    """
+    Survey-level input of compute_sensitivity_catalogue(): one 1-D float64
+    array per raw field (NaN marks a missing value), equal lengths.
+    """
+    theta_E_arcsec: object
+    z_l: object
+    z_s: object
+
+    @classmethod
+    def from_arrays(cls, theta_E_arcsec, z_l, z_s):
+        """Coerce and shape-check three array_likes (requires numpy)."""
+        return cls(*_as_arrays(theta_E_arcsec, z_l, z_s))
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        From an iterable of mappings with keys theta_E_arcsec, z_l, z_s;
+        absent, None or non-numeric values become NaN (flagged by validation).
+        """
+        cols = ([], [], [])
+        for rec in records:
+            for col, key in zip(cols, cls._fields):
+                try:
+                    col.append(float(rec.get(key)))
+                except (TypeError, ValueError):
+                    col.append(NAN)
+        return cls.from_arrays(*cols)
+
+
+class SensitivityBatchResult(NamedTuple):
+    """
+    Result of compute_sensitivity_batch(): the SensitivityResult fields as one
+    ndarray each (flags is an object array of list[str]), plus flag_bits, the
+    same flags as a uint32 FLAG_BIT bitmask per row.
+    """
+    is_valid: object
+    flags: object
+    flag_bits: object
+    theta_E_arcsec: object
+    z_l: object
+    z_s: object
+    theta_E_rad: object
+    D_l_m: object
+    Sigma_crit_kg_m2: object
+    M_inf_kg: object
+    S_dlnM_dzs: object
+    dM_over_M_for_delta_z: object
+
+
+def compute_sensitivity(theta_E_arcsec, z_l, z_s, cosmo, h=1e-3, delta_z=0.1,
+                        stencil='central2', derivative='fd'):
     """
     Compute M_inf, S(z_s), and ΔM/M mapping for one lens system.
 
@@ -53,19 +248,32 @@ def compute_sensitivity(theta_E_arcsec, z_l, z_s, cosmo, h=1e-3, delta_z=0.1):
     z_s : float
         Source redshift (assumed)
     cosmo : object
-        Cosmology object providing:
-            - angular_diameter_distance(z)
-            - sigma_crit(z_l, z_s)
+        Cosmology object providing either
+            - comoving_distance(z) and comoving_distance_pair(za, zb)
+              (src.cosmology.FlatLambdaCDM; distances are shared between
+              Σ_crit(z_s) and the stencil points), or
+            - angular_diameter_distance(z) and sigma_crit(z_l, z_s)
+              (one sigma_crit() call per stencil point).
+        derivative='analytic' needs comoving_distance(z) and
+        comoving_distance_dz(z) instead.
     h : float
         Finite-difference step for z_s (fixed). Must be > 0.
     delta_z : float
         Reference redshift error used for the derived mapping ΔM/M.
+    stencil : {'central2', 'richardson4'}
+        Finite-difference scheme for S. 'richardson4' also evaluates Σ_crit at
+        z_s ± 2h and is O(h^4), so a larger h can be used; where z_s - 2h <= z_l
+        it falls back to 'central2' (and to one-sided differences as usual).
+    derivative : {'fd', 'analytic'}
+        'analytic' takes S from dD_C/dz at z_s instead of finite differences:
+        no stencil evaluations and no one-sided fallback (stencil is then
+        ignored; h is still validated).
 
     Returns
     -------
-    dict with keys:
+    SensitivityResult with fields:
         - is_valid : bool
-        - flags : list[str]
+        - flags : tuple[str, ...]
         - theta_E_arcsec, z_l, z_s
         - theta_E_rad
         - D_l_m
@@ -74,115 +282,271 @@ def compute_sensitivity(theta_E_arcsec, z_l, z_s, cosmo, h=1e-3, delta_z=0.1):
         - S_dlnM_dzs
         - dM_over_M_for_delta_z
     """
-    out = {
-        'is_valid': False,
-        'flags': [],
-        'theta_E_arcsec': theta_E_arcsec,
-        'z_l': z_l,
-        'z_s': z_s,
-        'theta_E_rad': float('nan'),
-        'D_l_m': float('nan'),
-        'Sigma_crit_kg_m2': float('nan'),
-        'M_inf_kg': float('nan'),
-        'S_dlnM_dzs': float('nan'),
-        'dM_over_M_for_delta_z': float('nan'),
-    }
+    if stencil not in STENCILS:
+        raise ValueError("unknown stencil: %r" % (stencil,))
+    if derivative not in DERIVATIVES:
+        raise ValueError("unknown derivative: %r" % (derivative,))
+
+    # Invalid results echo the inputs as given, with the quantities computed
+    # so far and NaN for the rest; each is built only on its own exit path.
 
     # ---- Raw input validation ----
     v = validate_lens_inputs(theta_E_arcsec, z_l, z_s, require_zs=True, strict=True)
     if not v['is_valid']:
-        out['flags'] = list(v['flags'])
-        return out
+        return SensitivityResult(False, tuple(v['flags']), theta_E_arcsec, z_l, z_s,
+                                 NAN, NAN, NAN, NAN, NAN, NAN)
 
-    th_arcsec = v['normalized']['theta_E_arcsec']
-    zl = v['normalized']['z_l']
-    zs = v['normalized']['z_s']
+    norm = v['normalized']
+    th_arcsec = norm['theta_E_arcsec']
+    zl = norm['z_l']
+    zs = norm['z_s']
 
     if h is None or float(h) <= 0.0:
-        out['flags'] = ['flag_invalid_h']
-        return out
+        return SensitivityResult(False, ('flag_invalid_h',), theta_E_arcsec, z_l, z_s,
+                                 NAN, NAN, NAN, NAN, NAN, NAN)
+    h = float(h)
+    delta_z = float(delta_z)
 
     # ---- Compute core quantities ----
     theta_rad = th_arcsec * ARCSEC_TO_RAD
-    out['theta_E_rad'] = theta_rad
 
-    D_l = cosmo.angular_diameter_distance(zl)
-    out['D_l_m'] = D_l
+    shared = derivative == 'analytic' or hasattr(cosmo, 'comoving_distance_pair')
+    if shared:
+        # D_C(z_l) is shared by D_l, Σ_crit(z_s) and both stencil points below.
+        comoving_distance = cosmo.comoving_distance
+        Dc_l = comoving_distance(zl)
+        D_l = Dc_l / (1.0 + zl)
 
-    Sigma = cosmo.sigma_crit(zl, zs)
-    out['Sigma_crit_kg_m2'] = Sigma
+        Dc_s = comoving_distance(zs)
+        Sigma = _sigma_from_Dc(Dc_l, zl, Dc_s, zs)
+    else:
+        Dc_l = None
+        D_l = float(cosmo.angular_diameter_distance(zl))
+        Sigma = float(cosmo.sigma_crit(zl, zs))
+
+    if derivative == 'analytic':
+        # d ln Σ_crit / dz_s in closed form; only meaningful (and the
+        # denominators only non-zero) where Σ_crit(z_s) itself is defined.
+        S_exact = NAN
+        if Sigma == Sigma:
+            dDc_s = cosmo.comoving_distance_dz(zs)
+            S_exact = dDc_s / Dc_s - dDc_s / (Dc_s - Dc_l)
+        M_inf, S, dM_over_M, code = _sensitivity_kernel(
+            theta_rad, D_l, Sigma, NAN, NAN, NAN, NAN, S_exact, h, delta_z)
+        if code > CODE_BACKWARD:
+            return SensitivityResult(False, _KERNEL_FLAG_TUPLES[int(code)], theta_E_arcsec,
+                                     z_l, z_s, theta_rad, D_l, Sigma, M_inf, S, NAN)
+        return SensitivityResult(True, (), th_arcsec, zl, zs, theta_rad, D_l,
+                                 Sigma, M_inf, S, dM_over_M)
 
-    # Validate computed Sigma and distance
-    if (not _is_finite(D_l)) or D_l <= 0.0:
-        out['flags'] = ['flag_nonfinite_D_l']
-        return out
-    if (not _is_finite(Sigma)) or Sigma <= 0.0:
-        out['flags'] = ['flag_nonfinite_Sigma_crit']
-        return out
+    # ---- Sensitivity S(zs) = d ln Sigma / dzs via central difference ----
+    # π (D_l θ_E)^2 does not depend on z_s and cancels in ln M(z+) - ln M(z-),
+    # so only Σ_crit is evaluated at the stencil points (NaN at z_s - h when
+    # z_s - h <= z_l; the kernel then falls back to a one-sided difference).
+    sig_m, sig_p = sigma_crit_fd(cosmo, zl, zs, h, Dc_l=Dc_l)
+    if stencil == 'richardson4':
+        sig_m2, sig_p2 = sigma_crit_fd(cosmo, zl, zs, 2.0 * h, Dc_l=Dc_l)
+    else:
+        sig_m2 = sig_p2 = NAN
 
-    # M_inf(<θE; zs) = π (D_l θ_E)^2 Σ_crit
-    R = D_l * theta_rad
-    M_inf = math.pi * (R ** 2) * Sigma
-    out['M_inf_kg'] = M_inf
+    # Validity checks, M_inf, S and ΔM/M (src/_sensitivity_kernel.py)
+    M_inf, S, dM_over_M, code = _sensitivity_kernel(
+        theta_rad, D_l, Sigma, sig_p, sig_m, sig_p2, sig_m2, NAN, h, delta_z)
+    code = int(code)
+    if code > CODE_BACKWARD:
+        return SensitivityResult(False, _KERNEL_FLAG_TUPLES[code], theta_E_arcsec, z_l, z_s,
+                                 theta_rad, D_l, Sigma, M_inf, S, NAN)
 
-    if (not _is_finite(M_inf)) or M_inf <= 0.0:
-        out['flags'] = ['flag_nonfinite_M_inf']
-        return out
+    return SensitivityResult(True, _KERNEL_FLAG_TUPLES[code], th_arcsec, zl, zs, theta_rad, D_l,
+                             Sigma, M_inf, S, dM_over_M)
 
-    # ---- Sensitivity S(zs) = d ln Sigma / dzs via central difference ----
-    # Guard against zs-h <= zl (Sigma becomes undefined). In that case use one-sided difference.
-    flags = []
 
-    z_minus = zs - float(h)
-    z_plus = zs + float(h)
+def compute_sensitivity_vec(theta_E_arcsec, z_l, z_s, cosmo, h=1e-3, delta_z=0.1,
+                            stencil='central2', derivative='fd'):
+    """
+    compute_sensitivity_batch() reduced to (S, flags, valid).
+
+    Returns
+    -------
+    (S, flags, valid) :
+        S     : float ndarray, S_dlnM_dzs (NaN where invalid)
+        flags : object ndarray of list[str], per-row flags
+        valid : bool ndarray, is_valid per row
+    """
+    out = compute_sensitivity_batch(theta_E_arcsec, z_l, z_s, cosmo, h=h, delta_z=delta_z,
+                                    stencil=stencil, derivative=derivative)
+    return out.S_dlnM_dzs, out.flags, out.is_valid
+
+
+def compute_sensitivity_batch(theta_E_arcsec, z_l, z_s, cosmo, h=1e-3, delta_z=0.1,
+                              stencil='central2', derivative='fd'):
+    """
+    Vectorized compute_sensitivity() for N lens systems.
+
+    All comoving distances (at z_l, z_s and z_s ± h) come from one array
+    call to cosmo.comoving_distance, which FlatLambdaCDM serves from its
+    cached D_C(z) table, so the cost is O(N) array work instead of several
+    distance evaluations per lens.
 
-    def ln_sigma(zv):
-        s = cosmo.sigma_crit(zl, zv)
-        if (not _is_finite(s)) or s <= 0.0:
-            return float('nan')
-        return math.log(s)
+    Validation, flags and the one-sided fallback when z_s - h <= z_l follow
+    compute_sensitivity() exactly.
 
-    # Try central difference first.
-    ln_sp = ln_sigma(z_plus)
-    ln_sm = ln_sigma(z_minus)
+    Parameters
+    ----------
+    theta_E_arcsec, z_l, z_s : array_like
+        Numeric arrays of equal length (NaN marks a missing value).
+    cosmo : object
+        Cosmology providing comoving_distance(z) (and, for
+        derivative='analytic', comoving_distance_dz(z)) for arrays of z
+        (src.cosmology.FlatLambdaCDM).
+    h, delta_z, stencil, derivative :
+        As for compute_sensitivity().
 
-    if _is_finite(ln_sp) and _is_finite(ln_sm):
-        S = (ln_sp - ln_sm) / (2.0 * float(h))
+    Returns
+    -------
+    SensitivityBatchResult; test a flag across rows with e.g.
+    ``out.flag_bits & FLAG_BIT['flag_zs_le_zl'] != 0``.
+    """
+    if np is None:
+        raise ImportError("compute_sensitivity_batch requires numpy.")
+    if stencil not in STENCILS:
+        raise ValueError("unknown stencil: %r" % (stencil,))
+    if derivative not in DERIVATIVES:
+        raise ValueError("unknown derivative: %r" % (derivative,))
+    analytic = derivative == 'analytic'
+
+    th, zl, zs = _as_arrays(theta_E_arcsec, z_l, z_s)
+    n = th.shape[0]
+
+    flags, bad, bits = _validate_arrays(th, zl, zs)
+    out = {
+        'is_valid': np.zeros(n, dtype=bool),
+        'flags': flags,
+        'flag_bits': bits,
+        'theta_E_arcsec': th,
+        'z_l': zl,
+        'z_s': zs,
+        'theta_E_rad': np.full(n, np.nan),
+        'D_l_m': np.full(n, np.nan),
+        'Sigma_crit_kg_m2': np.full(n, np.nan),
+        'M_inf_kg': np.full(n, np.nan),
+        'S_dlnM_dzs': np.full(n, np.nan),
+        'dM_over_M_for_delta_z': np.full(n, np.nan),
+    }
+
+    ok = np.flatnonzero(~bad)
+    if h is None or float(h) <= 0.0:
+        for i in ok:
+            flags[i] = ['flag_invalid_h']
+        bits[ok] = FLAG_BIT['flag_invalid_h']
+        return SensitivityBatchResult(**out)
+    if ok.size == 0:
+        return SensitivityBatchResult(**out)
+
+    h = float(h)
+    delta_z = float(delta_z)
+    zl_v = zl[ok]
+    zs_v = zs[ok]
+    z_minus = zs_v - h
+    z_plus = zs_v + h
+
+    # z_s-independent pieces, shared by all three stencil points
+    Dc_l = cosmo.comoving_distance(zl_v)
+    D_l = Dc_l / (1.0 + zl_v)
+
+    # Σ_crit at z_s and at every stencil point from one stacked (3 or 5, N)
+    # evaluation: a single comoving_distance call and a single guard pass,
+    # so Σ_crit(z_s) for the fallback stencils is the value already stored.
+    # The analytic derivative needs Σ_crit(z_s) only.
+    zv = [zs_v] if analytic else [zs_v, z_plus, z_minus]
+    if stencil == 'richardson4' and not analytic:
+        zv += [zs_v + 2.0 * h, zs_v - 2.0 * h]
+    zv = np.stack(zv)
+    Dc_s = cosmo.comoving_distance(np.maximum(zv, 0.0).ravel()).reshape(zv.shape)
+    D_s = Dc_s / (1.0 + zv)
+    D_ls = (Dc_s - Dc_l) / (1.0 + zv)
+    good = (zv > zl_v) & (D_l > 0.0) & (D_s > 0.0) & (D_ls > 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sig = _SIGMA_PREF * (D_s / (D_l * D_ls))
+    sig = np.where(good & np.isfinite(sig) & (sig > 0.0), sig, np.nan)
+    Sigma = sig[0]
+
+    theta_rad = th[ok] * ARCSEC_TO_RAD
+    out['theta_E_rad'][ok] = theta_rad
+    out['D_l_m'][ok] = D_l
+    out['Sigma_crit_kg_m2'][ok] = Sigma
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        M_inf = math.pi * (D_l * theta_rad) ** 2 * Sigma
+
+    if analytic:
+        # Closed-form S where Σ_crit(z_s) is defined, as in the scalar path.
+        dDc_s = cosmo.comoving_distance_dz(zs_v)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            S = dDc_s / Dc_s[0] - dDc_s / (Dc_s[0] - Dc_l)
+        S[~np.isfinite(Sigma)] = np.nan
+        forward = backward = np.zeros(ok.size, dtype=bool)
     else:
-        # Fallback: one-sided differences (prefer forward)
-        ln_s0 = ln_sigma(zs)
-        if not _is_finite(ln_s0):
-            out['flags'] = ['flag_nonfinite_lnSigma_at_zs']
-            return out
-
-        ln_sp = ln_sigma(z_plus)
-        if _is_finite(ln_sp):
-            S = (ln_sp - ln_s0) / float(h)
-            flags.append('flag_used_forward_diff')
+        # One log of a ratio per row, as in the scalar kernel; the numerator and
+        # denominator are picked per stencil first, so only one np.log pass runs.
+        Sigma_p, Sigma_m = sig[1], sig[2]
+        ok_p = np.isfinite(Sigma_p)
+        ok_m = np.isfinite(Sigma_m)
+        central = ok_p & ok_m
+        forward = ~central & ok_p
+        backward = ~central & ~forward & ok_m
+        num = np.where(ok_p, Sigma_p, Sigma)
+        den = np.where(ok_m, Sigma_m, Sigma)
+        step = np.where(central, 2.0 * h, h)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            S = np.log(num / den) / step
+        S[~(ok_p | ok_m)] = np.nan
+        if stencil == 'richardson4':
+            rich = central & np.isfinite(sig[3]) & np.isfinite(sig[4])
+            S[rich] = (8.0 * np.log(Sigma_p[rich] / Sigma_m[rich])
+                       - np.log(sig[3][rich] / sig[4][rich])) / (12.0 * h)
+
+    # First failing check wins, as in compute_sensitivity().
+    Dl_ok = np.isfinite(D_l) & (D_l > 0.0)
+    sig_ok = np.isfinite(Sigma)
+    M_ok = np.isfinite(M_inf) & (M_inf > 0.0)
+    fail = [
+        ('flag_nonfinite_D_l', ~Dl_ok),
+        ('flag_nonfinite_Sigma_crit', ~sig_ok),
+        ('flag_nonfinite_M_inf', ~M_ok),
+        ('flag_nonfinite_S', ~np.isfinite(S)),
+    ]
+    failed = np.zeros(ok.size, dtype=bool)
+    for name, m in fail:
+        m = m & ~failed
+        for j in np.flatnonzero(m):
+            flags[ok[j]] = [name]
+        bits[ok[m]] = FLAG_BIT[name]
+        failed |= m
+
+    good = ~failed
+    bits[ok[good & forward]] = FLAG_BIT['flag_used_forward_diff']
+    bits[ok[good & backward]] = FLAG_BIT['flag_used_backward_diff']
+    for j in np.flatnonzero(good):
+        if forward[j]:
+            flags[ok[j]] = ['flag_used_forward_diff']
+        elif backward[j]:
+            flags[ok[j]] = ['flag_used_backward_diff']
         else:
-            ln_sm = ln_sigma(z_minus)
-            if _is_finite(ln_sm):
-                S = (ln_s0 - ln_sm) / float(h)
-                flags.append('flag_used_backward_diff')
-            else:
-                out['flags'] = ['flag_nonfinite_S']
-                return out
-
-    out['S_dlnM_dzs'] = S
-
-    if not _is_finite(S):
-        out['flags'] = ['flag_nonfinite_S']
-        return out
-
-    # Derived mapping for a reference redshift error delta_z
-    dz = float(delta_z)
-    out['dM_over_M_for_delta_z'] = S * dz
-
-    # Success
-    out['is_valid'] = True
-    out['flags'] = flags
-    out['theta_E_arcsec'] = th_arcsec
-    out['z_l'] = zl
-    out['z_s'] = zs
-    return out
-
+            flags[ok[j]] = []
+
+    # Outputs past the first failing stage stay NaN, as in the scalar path;
+    # the failing stage's own value is kept (e.g. a ±inf S).
+    out['M_inf_kg'][ok] = np.where(Dl_ok & sig_ok, M_inf, np.nan)
+    out['S_dlnM_dzs'][ok] = np.where(Dl_ok & sig_ok & M_ok, S, np.nan)
+    out['dM_over_M_for_delta_z'][ok] = np.where(good, S * delta_z, np.nan)
+    out['is_valid'][ok] = good
+    return SensitivityBatchResult(**out)
+
+
+def compute_sensitivity_catalogue(catalogue, cosmo, h=1e-3, delta_z=0.1, stencil='central2',
+                                  derivative='fd'):
+    """compute_sensitivity_batch() on a LensCatalogue; returns a SensitivityBatchResult."""
+    return compute_sensitivity_batch(catalogue.theta_E_arcsec, catalogue.z_l, catalogue.z_s,
+                                     cosmo, h=h, delta_z=delta_z, stencil=stencil,
+                                     derivative=derivative)
@@ -15,26 +15,31 @@ from __future__ import division
 
 import math
 
-from src.cosmology import FlatLambdaCDM
-from src.sensitivity import compute_sensitivity
-
+import pytest
 
-def _is_finite(x):
-    return (x is not None) and (not math.isnan(x)) and (not math.isinf(x))
+from src.cosmology import FlatLambdaCDM
+from src.sensitivity import (
+    FLAG_BIT,
+    LensCatalogue,
+    compute_sensitivity,
+    compute_sensitivity_batch,
+    compute_sensitivity_catalogue,
+    compute_sensitivity_vec,
+)
 
 
 def test_compute_sensitivity_valid_is_finite():
     cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
     res = compute_sensitivity(theta_E_arcsec=1.2, z_l=0.3, z_s=1.1, cosmo=cosmo, h=1e-3, delta_z=0.1)
 
-    assert res["is_valid"] is True
-    assert res["flags"] == []
+    assert res.is_valid is True
+    assert res.flags == ()
 
-    assert _is_finite(res["D_l_m"]) and res["D_l_m"] > 0.0
-    assert _is_finite(res["Sigma_crit_kg_m2"]) and res["Sigma_crit_kg_m2"] > 0.0
-    assert _is_finite(res["M_inf_kg"]) and res["M_inf_kg"] > 0.0
-    assert _is_finite(res["S_dlnM_dzs"])
-    assert _is_finite(res["dM_over_M_for_delta_z"])
+    assert math.isfinite(res.D_l_m) and res.D_l_m > 0.0
+    assert math.isfinite(res.Sigma_crit_kg_m2) and res.Sigma_crit_kg_m2 > 0.0
+    assert math.isfinite(res.M_inf_kg) and res.M_inf_kg > 0.0
+    assert math.isfinite(res.S_dlnM_dzs)
+    assert math.isfinite(res.dM_over_M_for_delta_z)
 
 
 def test_compute_sensitivity_zs_le_zl_is_invalid_and_flagged():
@@ -42,9 +47,9 @@ def test_compute_sensitivity_zs_le_zl_is_invalid_and_flagged():
 
     res = compute_sensitivity(theta_E_arcsec=1.2, z_l=0.8, z_s=0.8, cosmo=cosmo, h=1e-3, delta_z=0.1)
 
-    assert res["is_valid"] is False
+    assert res.is_valid is False
     # Raw input validation should catch this before cosmology is used.
-    assert "flag_zs_le_zl" in res["flags"]
+    assert "flag_zs_le_zl" in res.flags
 
 
 def test_S_is_invariant_to_thetaE_arcsec_to_tolerance():
@@ -53,14 +58,225 @@ def test_S_is_invariant_to_thetaE_arcsec_to_tolerance():
     res1 = compute_sensitivity(theta_E_arcsec=0.5, z_l=0.3, z_s=1.1, cosmo=cosmo, h=1e-3, delta_z=0.1)
     res2 = compute_sensitivity(theta_E_arcsec=2.0, z_l=0.3, z_s=1.1, cosmo=cosmo, h=1e-3, delta_z=0.1)
 
-    assert res1["is_valid"] is True and res2["is_valid"] is True
+    assert res1.is_valid is True and res2.is_valid is True
 
-    S1 = res1["S_dlnM_dzs"]
-    S2 = res2["S_dlnM_dzs"]
+    S1 = res1.S_dlnM_dzs
+    S2 = res2.S_dlnM_dzs
 
-    assert _is_finite(S1) and _is_finite(S2)
+    assert math.isfinite(S1) and math.isfinite(S2)
 
     # Numerical integration / finite difference introduces small error; require close agreement.
     # Tight enough to catch regressions, loose enough to be stable across machines.
     assert abs(S1 - S2) < 1e-6
 
+
+
+def test_compute_sensitivity_vec_matches_scalar_and_flags_invalid():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+
+    th = [1.2, 0.0, 1.0, float("nan")]
+    zl = [0.3, 0.3, 0.8, 0.3]
+    zs = [1.1, 1.1, 0.8, 1.1]
+    S, flags, valid = compute_sensitivity_vec(th, zl, zs, cosmo, h=1e-3, delta_z=0.1)
+
+    ref = compute_sensitivity(theta_E_arcsec=1.2, z_l=0.3, z_s=1.1, cosmo=cosmo, h=1e-3, delta_z=0.1)
+    assert list(valid) == [True, False, False, False]
+    assert abs(S[0] - ref.S_dlnM_dzs) <= 1e-8 * abs(ref.S_dlnM_dzs)
+    assert all(math.isnan(x) for x in S[1:])
+
+    assert flags[0] == []
+    assert flags[1] == ["flag_thetaE_nonpositive"]
+    assert flags[2] == ["flag_zs_le_zl"]
+    assert flags[3] == ["flag_nan_thetaE"]
+
+
+# Rows covering every branch: valid; z_l = 0 (D_l = 0); z_s - h <= z_l
+# (one-sided, h = 1e-3); z_s - 2h <= z_l < z_s - h and z_s - h <= z_l at
+# h = 0.05; several invalid raw inputs, one with two flags.
+_ROWS = [
+    (1.2, 0.3, 1.1),
+    (1.0, 0.0, 1.0),
+    (0.8, 0.5, 0.5005),
+    (1.2, 0.3, 0.38),
+    (0.8, 0.5, 0.52),
+    (-1.0, 0.3, 1.1),
+    (float("nan"), 0.3, float("nan")),
+    (1.0, 0.8, 0.8),
+]
+
+
+@pytest.mark.parametrize("stencil,derivative,h,rtol", [
+    ("central2", "fd", 1e-3, 1e-8),
+    ("central2", "fd", 0.05, 1e-8),
+    ("richardson4", "fd", 0.05, 1e-8),
+    ("central2", "analytic", 1e-3, 1e-12),
+])
+def test_batch_matches_scalar(stencil, derivative, h, rtol):
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    th, zl, zs = (list(c) for c in zip(*_ROWS))
+    out = compute_sensitivity_batch(th, zl, zs, cosmo, h=h, delta_z=0.1,
+                                    stencil=stencil, derivative=derivative)
+
+    for i in range(len(th)):
+        ref = compute_sensitivity(th[i], zl[i], zs[i], cosmo, h=h, delta_z=0.1,
+                                  stencil=stencil, derivative=derivative)
+        assert bool(out.is_valid[i]) is ref.is_valid
+        assert tuple(out.flags[i]) == ref.flags
+        assert out.flag_bits[i] == sum(FLAG_BIT[f] for f in ref.flags)
+        for k in ("theta_E_rad", "D_l_m", "Sigma_crit_kg_m2", "M_inf_kg", "S_dlnM_dzs",
+                  "dM_over_M_for_delta_z"):
+            r = getattr(ref, k)
+            if math.isfinite(r):
+                assert abs(getattr(out, k)[i] - r) <= rtol * abs(r)
+            else:
+                assert math.isnan(getattr(out, k)[i])
+
+
+def test_batch_flags_and_bits_for_mixed_rows():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    nan, inf = float("nan"), float("inf")
+    th = [1.2, nan, -1.0, 1.0, 0.8, 1.0, inf]
+    zl = [0.3, 0.3, -0.1, 0.8, 0.5, 0.0, 0.3]
+    zs = [1.1, nan, 1.1, 0.8, 0.5005, 1.0, 0.2]
+    expected = [
+        [],
+        ["flag_nan_thetaE", "flag_nan_zs"],
+        ["flag_thetaE_nonpositive", "flag_zl_negative"],
+        ["flag_zs_le_zl"],
+        ["flag_used_forward_diff"],
+        ["flag_nonfinite_D_l"],
+        ["flag_inf_thetaE", "flag_zs_le_zl"],
+    ]
+    out = compute_sensitivity_batch(th, zl, zs, cosmo)
+
+    assert [list(f) for f in out.flags] == expected
+    assert list(out.is_valid) == [True, False, False, False, True, False, False]
+    assert out.flag_bits.dtype.name == "uint32"
+    assert list(out.flag_bits) == [sum(FLAG_BIT[f] for f in e) for e in expected]
+    assert out.flag_bits[4] == FLAG_BIT["flag_used_forward_diff"]
+    # Raw-input failures compute nothing; the D_l = 0 row stops after D_l.
+    for i in (1, 2, 3, 6):
+        assert math.isnan(out.D_l_m[i]) and math.isnan(out.S_dlnM_dzs[i])
+    assert out.D_l_m[5] == 0.0 and math.isnan(out.M_inf_kg[5])
+    assert math.isnan(out.S_dlnM_dzs[5])
+    assert all(math.isfinite(out.S_dlnM_dzs[i]) for i in (0, 4))
+
+
+def test_richardson4_is_closer_to_analytic():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    exact = cosmo.dln_sigma_crit_dzs(0.3, 1.1)
+
+    c2 = compute_sensitivity(1.2, 0.3, 1.1, cosmo, h=0.05)
+    r4 = compute_sensitivity(1.2, 0.3, 1.1, cosmo, h=0.05, stencil="richardson4")
+    assert r4.is_valid and r4.flags == ()
+    assert abs(r4.S_dlnM_dzs - exact) < 0.1 * abs(c2.S_dlnM_dzs - exact)
+
+    # z_s - 2h <= z_l < z_s - h: falls back to the two-point central difference
+    near = compute_sensitivity(1.2, 0.3, 0.38, cosmo, h=0.05, stencil="richardson4")
+    assert near.S_dlnM_dzs == compute_sensitivity(1.2, 0.3, 0.38, cosmo, h=0.05).S_dlnM_dzs
+
+
+def test_catalogue_from_records_matches_batch():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    records = [
+        {"theta_E_arcsec": 1.2, "z_l": 0.3, "z_s": 1.1},
+        {"theta_E_arcsec": "n/a", "z_l": 0.3, "z_s": 1.1},
+        {"theta_E_arcsec": 0.8, "z_l": 0.5},
+    ]
+    cat = LensCatalogue.from_records(records)
+    assert cat.z_s.dtype.name == "float64" and math.isnan(cat.z_s[2])
+
+    out = compute_sensitivity_catalogue(cat, cosmo)
+    ref = compute_sensitivity_batch([1.2, float("nan"), 0.8], [0.3, 0.3, 0.5],
+                                    [1.1, 1.1, float("nan")], cosmo)
+    assert list(out.is_valid) == [True, False, False]
+    assert list(out.flags) == list(ref.flags)
+    assert out.S_dlnM_dzs[0] == ref.S_dlnM_dzs[0]
+
+
+def test_analytic_derivative_matches_fd():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    an = compute_sensitivity(1.2, 0.3, 1.1, cosmo, derivative="analytic")
+    fd = compute_sensitivity(1.2, 0.3, 1.1, cosmo)
+    assert an.flags == () and math.isclose(an.S_dlnM_dzs, cosmo.dln_sigma_crit_dzs(0.3, 1.1),
+                                           rel_tol=1e-14)
+    assert math.isclose(an.S_dlnM_dzs, fd.S_dlnM_dzs, rel_tol=1e-5)
+    # no one-sided fallback close to z_l
+    assert compute_sensitivity(0.8, 0.5, 0.5005, cosmo, derivative="analytic").flags == ()
+
+
+def test_batch_keeps_nonfinite_S_like_scalar():
+    # D_l θ_E, Σ_crit and M_inf stay finite but 1/(z_s - z_l) overflows in the
+    # analytic S: flag_nonfinite_S with S = -inf in both paths.
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=1e-172, Om0=0.3)
+    th, zl = 2e35, 1e-293
+    zs = zl + 4e-309
+    ref = compute_sensitivity(th, zl, zs, cosmo, derivative="analytic")
+    out = compute_sensitivity_batch([th], [zl], [zs], cosmo, derivative="analytic")
+    assert ref.flags == ('flag_nonfinite_S',) and ref.S_dlnM_dzs == -math.inf
+    assert tuple(out.flags[0]) == ref.flags and not out.is_valid[0]
+    assert out.S_dlnM_dzs[0] == ref.S_dlnM_dzs
+    assert math.isclose(out.M_inf_kg[0], ref.M_inf_kg, rel_tol=1e-12)
+    assert math.isnan(out.dM_over_M_for_delta_z[0])
+
+
+class _SigmaCritOnly(object):
+    """The baseline cosmology interface: no comoving_distance(_pair)."""
+
+    def __init__(self, cosmo):
+        self._cosmo = cosmo
+
+    def angular_diameter_distance(self, z):
+        return self._cosmo.angular_diameter_distance(z)
+
+    def sigma_crit(self, z_l, z_s):
+        return self._cosmo.sigma_crit(z_l, z_s)
+
+
+def test_compute_sensitivity_accepts_sigma_crit_only_cosmology():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    plain = _SigmaCritOnly(cosmo)
+    # central, one-sided (z_s - h <= z_l) and D_l = 0 rows; both stencils
+    for th, zl, zs in [(1.2, 0.3, 1.1), (0.8, 0.5, 0.5005), (1.0, 0.0, 1.0)]:
+        for stencil in ("central2", "richardson4"):
+            ref = compute_sensitivity(th, zl, zs, cosmo, stencil=stencil)
+            got = compute_sensitivity(th, zl, zs, plain, stencil=stencil)
+            assert got.flags == ref.flags and got.is_valid is ref.is_valid
+            if ref.is_valid:
+                assert math.isclose(got.S_dlnM_dzs, ref.S_dlnM_dzs, rel_tol=1e-8)
+
+
+class _SigmaCritBelow(_SigmaCritOnly):
+    """Σ_crit undefined (NaN) for source redshifts above z_max."""
+
+    def __init__(self, cosmo, z_max):
+        _SigmaCritOnly.__init__(self, cosmo)
+        self._z_max = z_max
+
+    def sigma_crit(self, z_l, z_s):
+        return float("nan") if z_s > self._z_max else self._cosmo.sigma_crit(z_l, z_s)
+
+
+def test_one_sided_fallbacks_and_no_stencil_point():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    h = 1e-3
+    sig = cosmo.sigma_crit
+
+    # z_s - h <= z_l: forward difference, still valid
+    fwd = compute_sensitivity(0.8, 0.5, 0.5005, cosmo, h=h)
+    assert fwd.is_valid and fwd.flags == ("flag_used_forward_diff",)
+    assert math.isclose(fwd.S_dlnM_dzs, math.log(sig(0.5, 0.5015) / sig(0.5, 0.5005)) / h,
+                        rel_tol=1e-8)
+    assert math.isclose(fwd.dM_over_M_for_delta_z, 0.1 * fwd.S_dlnM_dzs, rel_tol=1e-15)
+
+    # Σ_crit(z_s + h) undefined: backward difference
+    bwd = compute_sensitivity(1.2, 0.3, 1.1, _SigmaCritBelow(cosmo, 1.1), h=h)
+    assert bwd.is_valid and bwd.flags == ("flag_used_backward_diff",)
+    assert math.isclose(bwd.S_dlnM_dzs, math.log(sig(0.3, 1.1) / sig(0.3, 1.099)) / h,
+                        rel_tol=1e-8)
+
+    # neither stencil point defined: flag_nonfinite_S past a finite M_inf
+    none = compute_sensitivity(0.8, 0.5, 0.5005, _SigmaCritBelow(cosmo, 0.5005), h=h)
+    assert not none.is_valid and none.flags == ("flag_nonfinite_S",)
+    assert math.isfinite(none.M_inf_kg) and math.isnan(none.S_dlnM_dzs)
+    assert math.isnan(none.dM_over_M_for_delta_z)
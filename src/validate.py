@@ -16,12 +16,70 @@ This module validates raw catalogue fields only. Cosmology-derived quantities
 kernel after computation.
 """
 
+from math import isfinite
+
+# Optional numpy (only needed by validate_lens_inputs_batch).
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# Bit layout of raw-input flag bitmasks: bit i is VALIDATION_FLAGS[i].
+# Grouped per field in check order, so decoding bits in ascending order gives
+# the same list (and order) validate_lens_inputs() returns.
+VALIDATION_FLAGS = tuple(
+    ['flag_%s_%s' % (kind, name)
+     for name in ('thetaE', 'zl', 'zs')
+     for kind in ('missing', 'non_numeric', 'nan', 'inf')]
+    + ['flag_thetaE_nonpositive', 'flag_zl_negative', 'flag_zs_negative', 'flag_zs_le_zl']
+)
+_BIT = dict((name, i) for i, name in enumerate(VALIDATION_FLAGS))
+
+# Bit index of each cross-field check (0-11 are the per-field checks below)
+BIT_THETAE_NONPOSITIVE = _BIT['flag_thetaE_nonpositive']
+BIT_ZL_NEGATIVE = _BIT['flag_zl_negative']
+BIT_ZS_NEGATIVE = _BIT['flag_zs_negative']
+BIT_ZS_LE_ZL = _BIT['flag_zs_le_zl']
+
+# (missing, non_numeric, nan, inf) bit masks per field, prebuilt for _field_bits
+_FIELD_BITS = dict(
+    (name, tuple(1 << (4 * i + k) for k in range(4)))
+    for i, name in enumerate(('thetaE', 'zl', 'zs'))
+)
+
+_NAN = float('nan')
+
 def _is_nan(x):
     return x != x
 
 def _is_inf(x):
     return x == float('inf') or x == float('-inf')
 
+def _as_float(x):
+    """float(x) for a finite numeric x, else NaN (which compares False)."""
+    if x is None:
+        return _NAN
+    try:
+        v = float(x)
+    except (TypeError, ValueError):
+        return _NAN
+    return v if isfinite(v) else _NAN
+
+def _field_bits(x, name):
+    """Bit of the per-field check that rejected x (_as_float(x) was NaN)."""
+    missing, non_numeric, nan, inf = _FIELD_BITS[name]
+    if x is None:
+        return missing
+    try:
+        v = float(x)
+    except (TypeError, ValueError):
+        return non_numeric
+    if _is_nan(v):
+        return nan
+    if _is_inf(v):
+        return inf
+    return 0
+
 def validate_lens_inputs(theta_E_arcsec, z_l, z_s, require_zs=True, strict=True):
     """
     Validate raw per-system inputs.
@@ -33,57 +91,101 @@ def validate_lens_inputs(theta_E_arcsec, z_l, z_s, require_zs=True, strict=True)
           'normalized': {'theta_E_arcsec': float, 'z_l': float, 'z_s': float?}
         }
     """
-    flags = []
-    normalized = {}
-
-    def _to_float(x, name):
-        if x is None:
-            flags.append('flag_missing_%s' % name)
-            return None
-        try:
-            v = float(x)
-        except (TypeError, ValueError):
-            flags.append('flag_non_numeric_%s' % name)
-            return None
-        if _is_nan(v):
-            flags.append('flag_nan_%s' % name)
-            return None
-        if _is_inf(v):
-            flags.append('flag_inf_%s' % name)
-            return None
-        return v
-
-    th = _to_float(theta_E_arcsec, 'thetaE')
-    zl = _to_float(z_l, 'zl')
-
     # z_s may be optional upstream, but metric computation still requires it.
-    zs = None
-    if require_zs or (z_s is not None):
-        zs = _to_float(z_s, 'zs')
-
-    if th is not None and th <= 0.0:
-        flags.append('flag_thetaE_nonpositive')
-
-    if zl is not None and zl < 0.0:
-        flags.append('flag_zl_negative')
-
-    if require_zs:
-        if zs is not None and zs < 0.0:
-            flags.append('flag_zs_negative')
-        if zs is not None and zl is not None and not (zs > zl):
-            flags.append('flag_zs_le_zl')
-    else:
-        if zs is not None:
-            if zs < 0.0:
-                flags.append('flag_zs_negative')
-            if zl is not None and not (zs > zl):
-                flags.append('flag_zs_le_zl')
-
-    is_valid = (len(flags) == 0) if strict else True
-
-    if is_valid:
+    has_zs = require_zs or (z_s is not None)
+
+    # Rejected fields become NaN, so the cross-field checks below are simply
+    # False for them. The checks are OR-ed into a VALIDATION_FLAGS bitmask
+    # (bools are ints), and the flag list is only decoded when a check failed.
+    th = _as_float(theta_E_arcsec)
+    zl = _as_float(z_l)
+    zs = _as_float(z_s) if has_zs else _NAN
+    mask = ((th <= 0.0) << BIT_THETAE_NONPOSITIVE
+            | (zl < 0.0) << BIT_ZL_NEGATIVE
+            | (zs < 0.0) << BIT_ZS_NEGATIVE
+            | (zs <= zl) << BIT_ZS_LE_ZL)
+    if th != th:
+        mask |= _field_bits(theta_E_arcsec, 'thetaE')
+    if zl != zl:
+        mask |= _field_bits(z_l, 'zl')
+    if has_zs and zs != zs:
+        mask |= _field_bits(z_s, 'zs')
+
+    if mask == 0:
         normalized = {'theta_E_arcsec': th, 'z_l': zl}
-        if zs is not None:
+        if has_zs:
             normalized['z_s'] = zs
+        return {'is_valid': True, 'flags': [], 'normalized': normalized}
+
+    flags = decode_validation_flags(mask)
+    if strict:
+        return {'is_valid': False, 'flags': flags, 'normalized': {}}
+
+    # Non-strict: valid regardless of flags; rejected fields normalize to None.
+    normalized = {'theta_E_arcsec': None if th != th else th,
+                  'z_l': None if zl != zl else zl}
+    if zs == zs:
+        normalized['z_s'] = zs
+    return {'is_valid': True, 'flags': flags, 'normalized': normalized}
+
 
-    return {'is_valid': is_valid, 'flags': flags, 'normalized': normalized}
+def decode_validation_flags(bits):
+    """Flag names (validate_lens_inputs order) set in one VALIDATION_FLAGS bitmask."""
+    bits = int(bits)
+    flags = []
+    while bits:
+        low = bits & -bits  # lowest set bit
+        flags.append(VALIDATION_FLAGS[low.bit_length() - 1])
+        bits ^= low
+    return flags
+
+
+def validate_lens_inputs_batch(theta_E_arcsec, z_l, z_s):
+    """
+    Vectorized validate_lens_inputs(..., require_zs=True, strict=True) for
+    equal-length numeric arrays (requires numpy). NaN stands for a missing
+    value and is flagged as flag_nan_*.
+
+    Each check is one array predicate, OR-ed into a per-row bitmask.
+
+    Returns (is_valid, flag_bits): a bool ndarray and a uint16 ndarray whose
+    bit i is VALIDATION_FLAGS[i]; decode_validation_flags() maps a row's bits
+    back to its flag list.
+    """
+    if np is None:
+        raise ImportError("validate_lens_inputs_batch requires numpy.")
+
+    th = np.asarray(theta_E_arcsec, dtype=float)
+    zl = np.asarray(z_l, dtype=float)
+    zs = np.asarray(z_s, dtype=float)
+    bits = np.zeros(th.shape, dtype=np.uint16)
+
+    def _set(name, mask):
+        bits[...] |= mask.astype(np.uint16) << _BIT[name]
+
+    # Stop-on-first for the common all-finite field: one isfinite pass, and
+    # no nan/inf masks to build or to apply to the checks below.
+    finite = {}
+    for name, x in (('thetaE', th), ('zl', zl), ('zs', zs)):
+        ok = np.isfinite(x)
+        if ok.all():
+            finite[name] = None
+            continue
+        nan = np.isnan(x)
+        finite[name] = ok
+        _set('flag_nan_%s' % name, nan)
+        _set('flag_inf_%s' % name, ~ok & ~nan)
+
+    def _finite(mask, *names):
+        # Comparisons against NaN/inf rows are masked off, as in the scalar checks.
+        for name in names:
+            if finite[name] is not None:
+                mask &= finite[name]
+        return mask
+
+    _set('flag_thetaE_nonpositive', _finite(th <= 0.0, 'thetaE'))
+    _set('flag_zl_negative', _finite(zl < 0.0, 'zl'))
+    _set('flag_zs_negative', _finite(zs < 0.0, 'zs'))
+    _set('flag_zs_le_zl', _finite(zs <= zl, 'zs', 'zl'))
+
+    return bits == 0, bits
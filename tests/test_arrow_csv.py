@@ -0,0 +1,12 @@
+import math
+
+from src.io.arrow_csv import read_csv
+
+
+def test_read_csv_treats_pandas_na_strings_as_null(tmp_path):
+    path = tmp_path / "lenses.csv"
+    path.write_text("Name,zl,zs,thetaE\na,0.1,None,1.0\nb,<NA>,1.2,abc\nc,0.2,,NULL\n")
+    df = read_csv(path, float_columns=("zl",))
+    assert df["zl"].dtype == "float64" and math.isnan(df["zl"][1])
+    assert df["zs"].isna().tolist() == [True, False, True]
+    assert df["thetaE"].tolist()[:2] == ["1.0", "abc"] and df["thetaE"].isna()[2]
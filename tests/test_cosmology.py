@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.cosmology import FlatLambdaCDM
+
+
+def test_tabulated_comoving_distance_matches_direct_integration():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3)
+    for z in (0.0, 1e-4, 0.3, 1.1, 3.7, 9.99, 10.0):
+        direct = (299792458.0 / cosmo.H0_SI) * cosmo._Dc_integral(z)
+        assert math.isclose(cosmo.comoving_distance(z), direct, rel_tol=1e-10)
+
+
+# Array calls against scalar calls, over edge rows: z = 0, the table edge,
+# beyond z_tab_max (direct integration), z_s == z_l, z_s < z_l and D_l = 0.
+_ZL = [0.1, 0.3, 0.5, 0.8, 0.2, 0.0]
+_ZS = [0.6, 1.1, 0.5005, 0.8, 12.0, 1.0]
+
+
+@pytest.mark.parametrize("method,args", [
+    ("comoving_distance", ([0.0, 0.5, 1.9, 2.0, 2.5, 4.0],)),
+    ("comoving_distance_dz", ([0.0, 0.5, 2.5],)),
+    ("sigma_crit", (_ZL, _ZS)),
+    ("sigma_crit_batch", (_ZL, _ZS)),
+])
+def test_array_calls_match_scalar_calls(method, args):
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, z_tab_max=2.0)
+    arr = getattr(cosmo, method)(*(np.array(a) for a in args))
+    assert arr.shape == (len(args[0]),)
+    scalar = getattr(cosmo, "sigma_crit" if method == "sigma_crit_batch" else method)
+    for i, v in enumerate(arr):
+        ref = scalar(*(float(a[i]) for a in args))
+        if math.isnan(ref):
+            assert math.isnan(v)
+        else:
+            assert math.isclose(v, ref, rel_tol=1e-12)
+
+
+def test_comoving_distance_beyond_table_is_integrated():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, z_tab_max=2.0)
+    direct = (299792458.0 / cosmo.H0_SI) * cosmo._Dc_integral(4.0)
+    assert cosmo.comoving_distance(np.array([0.5, 4.0]))[-1] == direct
+    assert cosmo.comoving_distance(4.0) == direct
+
+
+def test_comoving_distance_pair_matches_two_lookups():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3)
+    Dc_a, Dc_b = cosmo.comoving_distance_pair(1.099, 1.101)
+    assert Dc_a == cosmo.comoving_distance(1.099)
+    assert math.isclose(Dc_b, cosmo.comoving_distance(1.101), rel_tol=1e-12)
+
+
+def test_distance_table_is_shared_and_exposed():
+    a = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3)
+    b = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3)
+    assert a == b and hash(a) == hash(b)
+    assert a._Dc_tab is b._Dc_tab
+    assert a != FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.31)
+
+    z_grid, chi = a.build_distance_table()
+    assert z_grid.shape == chi.shape == (a.n_tab + 1,)
+    for i in (0, 1, 1234, a.n_tab):
+        assert math.isclose(chi[i], a.comoving_distance(z_grid[i]), rel_tol=1e-14)
+
+    z_grid, chi = a.build_distance_table(0.1, 2.0, 11)
+    assert np.array_equal(chi, a.comoving_distance(z_grid))
+
+
+def test_memoized_comoving_distance_is_identical_and_bounded():
+    plain = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3)
+    memo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, memo_size=4)
+    for z in (0.3, 1.1, 0.3, 1.099, 1.101, 0.3, 2.0, 11.0):
+        assert memo.comoving_distance(z) == plain.comoving_distance(z)
+    assert len(memo._Dc_memo) <= 4
+    assert memo == plain
+
+
+def test_jitted_kernels_match_plain_python():
+    # The shared fastmath flags (src/_fastmath.py) only reorder arithmetic, so
+    # compiled results stay within ~1e-12 of the plain-Python fallback.
+    from src import cosmology
+    from src._sensitivity_kernel import _sensitivity_kernel
+
+    jit = cosmology._invE_integral_jit or cosmology._invE_integral
+    for b in (0.3, 1.1, 9.99):
+        assert math.isclose(jit(0.0, b, 0.3, 0.7, 4096),
+                            cosmology._invE_integral(0.0, b, 0.3, 0.7, 4096), rel_tol=1e-12)
+
+    py = getattr(_sensitivity_kernel, 'py_func', _sensitivity_kernel)
+    nan = float('nan')
+    Sigma = 4.2
+    for stencil2 in ((nan, nan), (Sigma * 0.999, Sigma * 1.001)):
+        args = (5.8e-6, 3.1e25, Sigma, Sigma * 0.9995, Sigma * 1.0005) + stencil2 + (nan, 1e-3, 0.1)
+        got, want = _sensitivity_kernel(*args), py(*args)
+        assert got[3] == want[3]
+        for g, w in zip(got[:3], want[:3]):
+            assert math.isclose(g, w, rel_tol=1e-12)
@@ -0,0 +1,24 @@
+from src.cosmology import FlatLambdaCDM
+from src.flags import SensitivityFlag, ValidationFlag, from_strings, to_legacy_strings
+from src.sensitivity import compute_sensitivity, compute_sensitivity_batch
+from src.validate import validate_lens_inputs, validate_lens_inputs_batch
+
+
+def test_flag_types_follow_the_string_flag_bits():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    th, zl, zs = [1.2, 0.8, -1.0, 1.0], [0.3, 0.5, 0.3, 0.0], [1.1, 0.5005, 1.1, 1.0]
+    out = compute_sensitivity_batch(th, zl, zs, cosmo)
+    for i in range(len(th)):
+        ref = compute_sensitivity(th[i], zl[i], zs[i], cosmo)
+        flag = SensitivityFlag(int(out.flag_bits[i]))
+        assert to_legacy_strings(flag) == list(ref.flags)
+        assert from_strings(ref.flags) == flag
+    assert SensitivityFlag.USED_FORWARD_DIFF in SensitivityFlag(int(out.flag_bits[1]))
+    assert (out.flag_bits & SensitivityFlag.THETAE_NONPOSITIVE != 0).tolist() == [False, False, True, False]
+
+
+def test_validation_flag_matches_batch_bits():
+    _, bits = validate_lens_inputs_batch([0.0], [0.8], [0.5])
+    flag = ValidationFlag(int(bits[0]))
+    assert flag == ValidationFlag.THETAE_NONPOSITIVE | ValidationFlag.ZS_LE_ZL
+    assert to_legacy_strings(flag) == validate_lens_inputs(0.0, 0.8, 0.5)['flags']
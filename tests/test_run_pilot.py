@@ -0,0 +1,29 @@
+import math
+
+from scripts import run_pilot
+from src.cosmology import FlatLambdaCDM
+from src.sensitivity import compute_sensitivity
+
+
+def test_read_input_missing_spellings_and_non_numeric_cells(tmp_path):
+    path = tmp_path / "pilot.csv"
+    path.write_text(
+        "lens_id,theta_E_arcsec,z_l,z_s,extra\n"
+        "A, 1.2 ,0.3,1.1,x\n"
+        "B,NULL,0.3,1.1,x\n"
+        "C,none,0.3,1.1,x\n"
+        "D,  ,0.3,1.1,x\n"
+        "E,NaN,0.3,1.1,x\n"
+        "F,abc,0.3,1.1,x\n"
+        "G,inf,0.3,1.1,x\n"
+    )
+    df = run_pilot._read_input(str(path))
+    assert list(df.columns) == ["lens_id", "theta_E_arcsec", "z_l", "z_s"]
+    th = list(df["theta_E_arcsec"])
+    assert th[0] == 1.2 and th[1:5] == [None] * 4 and th[5] == "abc" and th[6] == math.inf
+    assert df["z_l"].dtype == "float64"
+
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3, n_int=1024)
+    flags = [compute_sensitivity(t, 0.3, 1.1, cosmo).flags for t in th]
+    assert flags == [()] + [("flag_missing_thetaE",)] * 4 + [
+        ("flag_non_numeric_thetaE",), ("flag_inf_thetaE",)]
@@ -0,0 +1,53 @@
+import numpy as np
+
+from src.metrics import sensitivity as ref
+from src.metrics import sensitivity_numba as nb
+
+H0 = 70.0 * 1000.0 / 3.0856775814913673e22  # s^-1
+OM0 = 0.3
+
+
+def test_numba_port_matches_reference_functions():
+    for zl, zs in [(0.2, 0.8), (0.3, 1.1), (0.5, 0.5005)]:
+        assert np.isclose(nb.sigma_crit(zl, zs, H0, OM0), ref.sigma_crit(zl, zs, H0, OM0), rtol=1e-10)
+        assert np.isclose(nb.Minf(1.2, zl, zs, H0, OM0), ref.Minf(1.2, zl, zs, H0, OM0), rtol=1e-10)
+        assert np.isclose(nb.dlnM_dzs(1.2, zl, zs, H0, OM0), ref.dlnM_dzs(1.2, zl, zs, H0, OM0), rtol=1e-6)
+
+
+def test_dlnM_dzs_batch_matches_scalar_loop():
+    th = np.array([0.6, 1.2, 2.0])
+    zl = np.array([0.2, 0.3, 0.8])
+    zs = np.array([0.8, 1.1, 0.8])  # last row: zs <= zl -> NaN
+    S, dlnM, M = nb.dlnM_dzs_batch(th, zl, zs, H0, OM0, 1e-3)
+
+    for i in range(2):
+        assert np.isclose(dlnM[i], ref.dlnM_dzs(th[i], zl[i], zs[i], H0, OM0), rtol=1e-6)
+        assert np.isclose(M[i], ref.Minf(th[i], zl[i], zs[i], H0, OM0), rtol=1e-10)
+        assert S[i] == abs(dlnM[i])
+    assert np.isnan(dlnM[2]) and np.isnan(S[2]) and np.isnan(M[2])
+
+
+def test_dlnM_dzs_analytic_matches_fd():
+    for zl, zs in [(0.2, 0.8), (0.3, 1.1)]:
+        fd = ref.dlnM_dzs(1.2, zl, zs, H0, OM0)
+        an = ref.dlnM_dzs(1.2, zl, zs, H0, OM0, method="analytic")
+        assert np.isclose(an, fd, rtol=1e-5)
+    assert np.isnan(ref.dlnM_dzs(1.2, 0.8, 0.8, H0, OM0, method="analytic"))
+
+
+def test_comoving_distance_table_accepts_arrays():
+    z = np.array([0.0, 0.3, 2.5, 12.0])  # last entry beyond the table
+    Dc = ref.comoving_distance(z, H0, OM0)
+    assert Dc[0] == 0.0
+    for zi, Di in zip(z[1:], Dc[1:]):
+        assert np.isclose(Di, nb.comoving_distance(zi, H0, OM0), rtol=1e-10)
+        assert Di == ref.comoving_distance(float(zi), H0, OM0)
+
+
+def test_sigma_crit_arrays_match_scalar_calls():
+    zl = np.array([0.3, 0.5, 0.8, 0.0])
+    zs = np.array([1.1, 0.5, 0.7, 1.0])  # zs == zl, zs < zl and D_l = 0 rows
+    sig = ref.sigma_crit(zl, zs, H0, OM0)
+    assert np.isclose(sig[0], ref.sigma_crit(0.3, 1.1, H0, OM0), rtol=1e-12)
+    assert np.isnan(sig[1:]).all()
+    assert all(np.isnan(ref.sigma_crit(a, b, H0, OM0)) for a, b in zip(zl[1:], zs[1:]))
@@ -0,0 +1,30 @@
+import math
+
+from src.cosmology import FlatLambdaCDM
+from src.sensitivity import sigma_crit_fd
+
+
+def test_sigma_crit_fd_matches_sigma_crit():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3)
+    sig_m, sig_p = sigma_crit_fd(cosmo, 0.3, 1.1, 1e-3)
+    assert math.isclose(sig_m, cosmo.sigma_crit(0.3, 1.099), rel_tol=1e-12)
+    assert math.isclose(sig_p, cosmo.sigma_crit(0.3, 1.101), rel_tol=1e-12)
+
+
+def test_sigma_crit_fd_lower_point_undefined_near_lens():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3)
+    sig_m, sig_p = sigma_crit_fd(cosmo, 0.5, 0.5005, 1e-3)
+    assert math.isnan(sig_m)
+    assert math.isclose(sig_p, cosmo.sigma_crit(0.5, 0.5015), rel_tol=1e-12)
+
+
+def test_analytic_dln_sigma_crit_dzs_matches_central_difference():
+    cosmo = FlatLambdaCDM(H0_km_s_Mpc=70.0, Om0=0.3)
+    h = 1e-4
+    for z_l, z_s in [(0.3, 1.1), (0.1, 3.0)]:
+        sig_m, sig_p = sigma_crit_fd(cosmo, z_l, z_s, h)
+        fd = (math.log(sig_p) - math.log(sig_m)) / (2.0 * h)
+        S = cosmo.dln_sigma_crit_dzs(z_l, z_s)
+        assert S < 0.0
+        assert math.isclose(S, fd, rel_tol=1e-6)
+    assert math.isnan(cosmo.dln_sigma_crit_dzs(0.8, 0.8))
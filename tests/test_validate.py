@@ -1,4 +1,4 @@
-from src.validate import validate_lens_inputs
+from src.validate import decode_validation_flags, validate_lens_inputs, validate_lens_inputs_batch
 
 def test_valid_inputs_pass_strict():
     res = validate_lens_inputs(theta_E_arcsec=1.2, z_l=0.3, z_s=1.1, strict=True)
@@ -29,3 +29,15 @@ def test_missing_zs_allowed_when_not_required():
     assert res['is_valid'] is True
     assert res['flags'] == []
     assert 'z_s' not in res['normalized']
+
+def test_batch_matches_scalar_flags():
+    nan, inf = float('nan'), float('inf')
+    rows = [(1.2, 0.3, 1.1), (0.0, 0.3, 1.1), (1.2, 0.8, 0.8), (nan, -0.1, 0.5),
+            (1.0, inf, 1.0), (-1.0, 0.2, -0.5), (1.0, nan, nan)]
+    th, zl, zs = (list(c) for c in zip(*rows))
+    is_valid, bits = validate_lens_inputs_batch(th, zl, zs)
+    assert bits.dtype.name == 'uint16'
+    for i, row in enumerate(rows):
+        ref = validate_lens_inputs(*row, require_zs=True, strict=True)
+        assert bool(is_valid[i]) is ref['is_valid']
+        assert decode_validation_flags(bits[i]) == ref['flags']